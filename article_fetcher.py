@@ -0,0 +1,134 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from lxml import html as lxml_html
+
+CACHE_DIR = os.path.join('cache', 'articles')
+MAX_BYTES = 2 * 1024 * 1024
+MAX_CHARS = 4000
+USER_AGENT = 'Mozilla/5.0 (compatible; NewsAgent/1.0)'
+
+NOISE_TAGS = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'iframe', 'svg', 'figure']
+
+
+def url_key(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+class ArticleCache:
+    """Extracted article text keyed by URL hash, gzip-compressed on disk"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def path_for(self, url):
+        key = url_key(url)
+        return os.path.join(self.cache_dir, key[:2], f'{key}.json.gz')
+
+    def get(self, url):
+        try:
+            with gzip.open(self.path_for(url), 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, url, text):
+        path = self.path_for(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            'url': url,
+            'text': text,
+            'content_hash': hashlib.sha1(text.encode('utf-8')).hexdigest(),
+            'fetched_at': int(time.time())
+        }
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return entry
+
+
+def extract_main_text(page_html, max_chars=MAX_CHARS):
+    """Readability-style extraction: the block with the most paragraph text wins"""
+    try:
+        doc = lxml_html.fromstring(page_html)
+    except (ValueError, lxml_html.etree.ParserError):
+        return ''
+
+    for element in doc.iter(*NOISE_TAGS):
+        element.drop_tree()
+
+    # Prefer an explicit <article>; otherwise score parents by their <p> text
+    candidates = doc.xpath('//article')
+    if not candidates:
+        scores = {}
+        for p in doc.iter('p'):
+            parent = p.getparent()
+            if parent is None:
+                continue
+            length = len(p.text_content().strip())
+            if length > 40:
+                scores[parent] = scores.get(parent, 0) + length
+        if not scores:
+            return ''
+        candidates = [max(scores, key=scores.get)]
+
+    best = max(candidates, key=lambda el: len(el.text_content()))
+    paragraphs = [' '.join(p.text_content().split()) for p in best.iter('p')]
+    text = '\n'.join(p for p in paragraphs if len(p) > 40)
+    if not text:
+        text = ' '.join(best.text_content().split())
+    return text[:max_chars]
+
+
+def download(url, timeout=10, max_bytes=MAX_BYTES):
+    """GET a page, refusing non-HTML and capping the body size"""
+    with requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        if 'html' not in response.headers.get('Content-Type', 'text/html'):
+            return None
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=65536):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                break
+        return b''.join(chunks)
+
+
+def fetch_article(url, cache):
+    """Extracted text for one URL, fetched and parsed at most once"""
+    cached = cache.get(url)
+    if cached is not None:
+        return cached['text']
+    try:
+        page = download(url)
+    except Exception as e:
+        print(f"    ⚠️  Could not fetch {url}: {e}")
+        return ''
+    text = extract_main_text(page) if page else ''
+    cache.put(url, text)
+    return text
+
+
+def enrich_items(items, top_k=10, max_workers=8, cache=None):
+    """Attach extracted article text to the first top_k items; callers pass them ranked"""
+    cache = cache or ArticleCache()
+    targets = [item for item in items[:top_k] if item.url.startswith('http')]
+    if not targets:
+        return items
+
+    print(f"  Fetching full content for {len(targets)} articles...")
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        texts = pool.map(lambda item: fetch_article(item.url, cache), targets)
+        for item, text in zip(targets, texts):
+            item.content = text or None
+
+    enriched = sum(1 for item in targets if item.content)
+    print(f"    Extracted text for {enriched}/{len(targets)} articles")
+    return items
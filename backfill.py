@@ -0,0 +1,241 @@
+import os
+import re
+import sys
+import glob
+import json
+import time
+import codecs
+import argparse
+from html.parser import HTMLParser
+
+from output_writer import atomic_write
+
+OUTPUT_DIR = 'output'
+DATASET_FILE = os.path.join('cache', 'stories-backfill.jsonl')
+
+CHUNK_SIZE = 64 * 1024
+
+# Elements that never get an end tag, so they must not be pushed on the stack
+VOID_TAGS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'wbr'])
+
+PAGE_DATE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})')
+RELEVANCE_RE = re.compile(r'(\d+(?:\.\d+)?)\s*/\s*10')
+WHY_PREFIX_RE = re.compile(r'^why it matters:?\s*', re.IGNORECASE)
+SPACE_RE = re.compile(r'\s+')
+
+# Card classes across template generations:
+#   story-card - render_news digests and the interactive viewer
+#   card       - the original hand-styled summary pages
+CARD_CLASSES = frozenset(['story-card', 'card'])
+
+LIST_FIELDS = ('paragraphs', 'takeaways')
+
+
+def clean(text):
+    return SPACE_RE.sub(' ', text).strip()
+
+
+class StoryExtractor(HTMLParser):
+    """Event-driven story extraction that tolerates every template generation.
+
+    Keeps only a tag stack and the card being built, so memory stays flat
+    regardless of page size. Text is routed to the field of the innermost
+    open element that has one.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+        self.section = ''
+        self.card = None
+        self.card_depth = None
+        self.stories = []
+
+    def field_for(self, tag, classes, attrs):
+        """Which story field an element inside a card feeds, if any"""
+        enclosing = {c for _, cls, _ in self.stack[self.card_depth:] for c in cls}
+        if tag == 'span' and 'category-badge' in classes:
+            return 'category'
+        if tag == 'span' and 'relevance-badge' in classes:
+            return 'relevance'
+        if tag == 'span' and 'story-footer' in enclosing:
+            return 'story_date'
+        if tag == 'a':
+            href = attrs.get('href')
+            if href and not self.card.get('url'):
+                self.card['url'] = href
+            return 'source' if 'source-link' in classes else 'link_text'
+        if tag == 'h3':
+            return 'title'
+        if tag == 'li':
+            return 'takeaways'
+        if tag == 'p' and 'why-matters' in enclosing:
+            return 'why'
+        if tag == 'div' and 'why-relevant-text' in classes:
+            return 'why'
+        if tag == 'p' and 'takeaways' not in enclosing:
+            return 'paragraphs'
+        return None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = frozenset((attrs.get('class') or '').split())
+        field = None
+
+        if self.card is None and tag == 'div' and classes & CARD_CLASSES:
+            self.card = {'section': self.section}
+            self.card_depth = len(self.stack)
+        elif self.card is not None:
+            field = self.field_for(tag, classes, attrs)
+            if field in LIST_FIELDS:
+                self.card.setdefault(field, []).append('')
+        elif tag == 'h2':
+            field = 'section'
+            self.section = ''
+
+        if tag not in VOID_TAGS:
+            self.stack.append((tag, classes, field))
+
+    def handle_startendtag(self, tag, attrs):
+        if tag not in VOID_TAGS:
+            self.handle_starttag(tag, attrs)
+            self.handle_endtag(tag)
+        else:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        # Pop to the matching tag so stray unclosed elements do not desync
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth][0] == tag:
+                break
+        else:
+            return
+        del self.stack[depth:]
+        if self.card is not None and depth == self.card_depth:
+            self.stories.append(self.card)
+            self.card = None
+            self.card_depth = None
+
+    def handle_data(self, data):
+        for _, _, field in reversed(self.stack):
+            if field is None:
+                continue
+            if self.card is None:
+                if field == 'section':
+                    self.section = clean(self.section + ' ' + data)
+            elif field in LIST_FIELDS:
+                self.card[field][-1] += data
+            else:
+                self.card[field] = self.card.get(field, '') + data
+            return
+
+
+def finish_story(raw, page, digest_date):
+    """Normalize a raw card into the dataset schema"""
+    paragraphs = [clean(p) for p in raw.get('paragraphs', []) if clean(p)]
+    why = clean(raw.get('why', ''))
+    summary_parts = []
+    for paragraph in paragraphs:
+        if WHY_PREFIX_RE.match(paragraph):
+            why = why or WHY_PREFIX_RE.sub('', paragraph)
+        else:
+            summary_parts.append(paragraph)
+    # The viewer generation left "Why It Matters" as placeholder text
+    if why.lower().rstrip(':') == 'why it matters':
+        why = ''
+
+    relevance = RELEVANCE_RE.search(raw.get('relevance', ''))
+    return {
+        'page': page,
+        'digest_date': digest_date,
+        'title': clean(raw.get('title', '')) or clean(raw.get('link_text', '')),
+        'url': raw.get('url', ''),
+        'summary': ' '.join(summary_parts),
+        'why_relevant': why,
+        'category': clean(raw.get('category', '')) or raw.get('section', ''),
+        'source': clean(raw.get('source', '')).rstrip('→').strip(),
+        'date': clean(raw.get('story_date', '')),
+        'relevance_score': float(relevance.group(1)) if relevance else None,
+        'takeaways': [clean(t) for t in raw.get('takeaways', []) if clean(t)],
+    }
+
+
+def extract_stream(stream, page):
+    """Stories from a binary stream, fed to the parser in chunks"""
+    # Incremental decoder so multi-byte characters split across chunks survive
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    parser = StoryExtractor()
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        parser.feed(decoder.decode(chunk))
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    match = PAGE_DATE_RE.search(page)
+    digest_date = match.group(1) if match else None
+    return [finish_story(raw, page, digest_date) for raw in parser.stories if raw.get('title') or raw.get('link_text')]
+
+
+def extract_source(source):
+    """Worker: (pages, stories) for a loose page or a whole monthly bundle"""
+    if source.endswith('.tar.xz'):
+        import tarfile
+
+        stories, pages = [], 0
+        with tarfile.open(source, 'r:xz') as tar:
+            for member in tar:
+                if member.isfile():
+                    pages += 1
+                    stories.extend(extract_stream(tar.extractfile(member), member.name))
+        return pages, stories
+
+    with open(source, 'rb') as f:
+        return 1, extract_stream(f, os.path.basename(source))
+
+
+def archive_sources(output_dir=OUTPUT_DIR):
+    """Dated and original pages plus packed bundles; latest.html is a copy"""
+    pages = glob.glob(os.path.join(output_dir, 'news-summary-*.html'))
+    pages += glob.glob(os.path.join(output_dir, 'original-*.html'))
+    bundles = glob.glob(os.path.join(output_dir, 'bundles', '*.tar.xz'))
+    # Bundles first: each one is a long task, so start them early
+    return sorted(bundles) + sorted(pages)
+
+
+def backfill(output_file=DATASET_FILE, workers=None):
+    from concurrent.futures import ProcessPoolExecutor
+
+    sources = archive_sources()
+    if not sources:
+        print("⚠️  No archive pages found")
+        return 0
+
+    start = time.perf_counter()
+    pages = 0
+    stories = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for page_count, page_stories in pool.map(extract_source, sources, chunksize=4):
+            pages += page_count
+            stories.extend(page_stories)
+    elapsed = time.perf_counter() - start
+
+    stories.sort(key=lambda s: (s['digest_date'] or '', s['page']))
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    atomic_write(output_file, ''.join(json.dumps(s, ensure_ascii=False) + '\n' for s in stories))
+
+    print(f"✅ {len(stories)} stories from {pages} pages -> {output_file}")
+    print(f"⏱️  {elapsed:.2f}s ({pages / elapsed:.0f} files/sec)")
+    return len(stories)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract stories from every archived digest page into one JSON-lines file")
+    parser.add_argument('--output', default=DATASET_FILE, help="dataset path")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    return 0 if backfill(args.output, args.workers) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import re
+import json
+from collections import Counter
+
+CATEGORIES_FILE = 'categories.json'
+
+SOURCE_WEIGHT = 3
+
+
+class Categorizer:
+    """Keyword/source categorizer compiled into a single regex.
+
+    Every keyword from every category goes into one alternation, so each
+    item's text is lowercased once and scanned once regardless of how many
+    categories or keywords are configured.
+    """
+
+    def __init__(self, config):
+        self.default = config.get('default', 'General Tech')
+        self.order = list(config['categories'].keys())
+        if self.default not in self.order:
+            self.order.append(self.default)
+
+        self.source_rules = []
+        self.keyword_map = {}
+        for category, rules in config['categories'].items():
+            for source in rules.get('sources', []):
+                self.source_rules.append((source, category))
+            for keyword in rules.get('keywords', []):
+                self.keyword_map.setdefault(keyword.lower(), []).append(category)
+
+        if self.keyword_map:
+            # Longest first so "vs code" wins over "code"-style prefixes
+            alternation = '|'.join(re.escape(k) for k in sorted(self.keyword_map, key=len, reverse=True))
+            self.pattern = re.compile(r'\b(?:' + alternation + r')\b')
+        else:
+            self.pattern = None
+
+        self._source_cache = {}
+
+    @classmethod
+    def from_file(cls, path=CATEGORIES_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def source_category(self, source):
+        """Category assigned by source name, memoized since sources repeat"""
+        if source not in self._source_cache:
+            match = None
+            for needle, category in self.source_rules:
+                if needle in source:
+                    match = category
+                    break
+            self._source_cache[source] = match
+        return self._source_cache[source]
+
+    def score(self, item):
+        """Multi-label scores: normalized keyword hits plus source weight"""
+        hits = Counter()
+
+        source_category = self.source_category(item.source)
+        if source_category:
+            hits[source_category] += SOURCE_WEIGHT
+
+        if self.pattern is not None:
+            text = f"{item.title} {item.summary}".lower()
+            for match in self.pattern.finditer(text):
+                for category in self.keyword_map[match.group(0)]:
+                    hits[category] += 1
+
+        total = sum(hits.values())
+        if not total:
+            return {}
+        return {category: count / total for category, count in hits.items()}
+
+    def classify(self, item):
+        """Primary category: source rule first, then best keyword score"""
+        source_category = self.source_category(item.source)
+        if source_category:
+            return source_category
+
+        scores = self.score(item)
+        if not scores:
+            return self.default
+        best = max(scores.values())
+        return next(c for c in self.order if scores.get(c) == best)
+
+    def categorize(self, items):
+        """Group items by primary category, preserving configured order"""
+        categories = {category: [] for category in self.order}
+        for item in items:
+            categories[self.classify(item)].append(item)
+        return categories
+
+
+_default_categorizer = None
+
+
+def get_categorizer():
+    """Shared categorizer loaded from categories.json"""
+    global _default_categorizer
+    if _default_categorizer is None:
+        _default_categorizer = Categorizer.from_file()
+    return _default_categorizer
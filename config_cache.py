@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+CACHE_DIR = 'cache'
+
+DEFAULT_CONFIG = {
+    'projects': [],
+    'learning': [],
+    'tracking_companies': [],
+    'role': 'Developer',
+    'interests': []
+}
+
+
+def default_config():
+    return json.loads(json.dumps(DEFAULT_CONFIG))
+
+
+class ConfigCache:
+    """Last good profile from the config worker, persisted with its ETag.
+
+    A cached profile is returned immediately and refreshed in a background
+    thread; the network is only waited on when nothing is cached yet.
+    """
+
+    def __init__(self, api_endpoint, api_key, cache_dir=CACHE_DIR, timeout=10):
+        self.api_endpoint = api_endpoint
+        self.api_key = api_key
+        self.timeout = timeout
+        key = hashlib.sha1(f"{api_endpoint}\0{api_key}".encode('utf-8')).hexdigest()[:12]
+        self.path = os.path.join(cache_dir, f'user-config-{key}.json')
+        self.refresh_thread = None
+
+    def read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def write(self, entry):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def fetch(self, cached=None):
+        """Conditional GET; returns the fresh entry, or the cached one on 304"""
+        import requests
+
+        headers = {'Authorization': f'Bearer {self.api_key}'}
+        if cached and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+
+        response = requests.get(f"{self.api_endpoint}/config", headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached:
+            cached['checked_at'] = time.time()
+            self.write(cached)
+            return cached
+
+        response.raise_for_status()
+        config = response.json()
+        etag = response.headers.get('ETag')
+        version = etag or hashlib.sha1(
+            json.dumps(config, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:12]
+        entry = {
+            'config': config,
+            'etag': etag,
+            'version': version,
+            'fetched_at': time.time(),
+            'checked_at': time.time()
+        }
+        self.write(entry)
+        return entry
+
+    def _refresh(self, cached):
+        try:
+            entry = self.fetch(cached)
+            if entry['version'] != cached.get('version'):
+                print(f"🔄 User config updated in background (version {entry['version']})")
+        except Exception as e:
+            print(f"⚠️  Background config refresh failed, keeping cached copy: {e}")
+
+    def get(self):
+        """Return the profile, blocking on the network only without a cache"""
+        cached = self.read()
+        if cached:
+            age_hours = (time.time() - cached.get('fetched_at', 0)) / 3600
+            print(f"✅ Using cached user config (version {cached.get('version')}, {age_hours:.1f}h old)")
+            # Non-daemon so the refresh can finish writing before exit
+            self.refresh_thread = threading.Thread(target=self._refresh, args=(cached,))
+            self.refresh_thread.start()
+            return cached['config']
+
+        entry = self.fetch()
+        return entry['config']
+
+
+def load_user_config():
+    """Fetch user configuration from Cloudflare Worker via the local cache"""
+    api_endpoint = os.environ.get('CONFIG_API_ENDPOINT')
+    api_key = os.environ.get('CONFIG_API_KEY')
+
+    if not api_endpoint or not api_key:
+        print("⚠️  No config API set, using defaults")
+        return default_config()
+
+    try:
+        config = ConfigCache(api_endpoint, api_key).get()
+        print(f"✅ Loaded user config: {len(config.get('projects', []))} projects, {len(config.get('learning', []))} learning topics")
+        return config
+    except Exception as e:
+        print(f"⚠️  Could not fetch config and no cached copy: {e}")
+        return default_config()
@@ -0,0 +1,251 @@
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+from digest_format import iter_digests
+from history_store import HistoryStore, url_hash, title_hash
+from news_item import canonical_url
+
+EVAL_FILE = 'eval.json'
+
+# Mixes a digest index into a 64-bit hash so (digest, hash) pairs can be
+# matched with one np.isin over the whole archive
+SALT = np.int64(-7046029254386353131)
+TITLE_SALT = np.int64(2685821657736338717)
+
+
+def load_config(path=EVAL_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def keyed(digest_ids, hashes):
+    return hashes ^ (digest_ids.astype(np.int64) * SALT)
+
+
+def collect(digests, store, categories):
+    """Flatten every digest into story, action-link and input columns"""
+    category_ids = {name: i for i, name in enumerate(categories)}
+    stories = {'digest': [], 'raw': [], 'canonical': [], 'title': [], 'score': [], 'category': []}
+    actions = {'digest': [], 'links': []}
+    links = {'action': [], 'story': []}
+    inputs = {'digest': [], 'url': [], 'title': []}
+    has_input = []
+    has_canonical = []
+    has_title = []
+
+    for d, (date_str, digest) in enumerate(digests):
+        offset = len(stories['digest'])
+        for story in digest.get('stories', []):
+            url = story.get('url', '')
+            stories['digest'].append(d)
+            stories['raw'].append(url_hash(url))
+            stories['canonical'].append(url_hash(canonical_url(url)))
+            stories['title'].append(title_hash(story.get('title')))
+            stories['score'].append(float(story.get('relevance_score') or 0))
+            stories['category'].append(category_ids.get(story.get('category'), -1))
+        count = len(stories['digest']) - offset
+        for action in digest.get('actions', []):
+            related = [i for i in action.get('related_stories', []) if 0 <= i < count]
+            links['action'].extend([len(actions['digest'])] * len(related))
+            links['story'].extend(offset + i for i in related)
+            actions['digest'].append(d)
+            actions['links'].append(len(related))
+
+        # The run's history partition is the set of items the model was given
+        day = store.day(date_str)
+        has_input.append(day is not None)
+        has_canonical.append(day is not None and 'canonical_hash' in day)
+        has_title.append(day is not None and 'title_hash' in day)
+        if day is not None:
+            urls = day.get('canonical_hash', day['url_hash'])
+            inputs['digest'].append(np.full(len(urls), d, dtype=np.int64))
+            inputs['url'].append(urls)
+            inputs['title'].append(day['title_hash'] if 'title_hash' in day else np.zeros(len(urls), dtype=np.int64))
+
+    stories = {name: np.array(values, dtype=np.float64 if name == 'score' else np.int64)
+               for name, values in stories.items()}
+    actions = {name: np.array(values, dtype=np.int64) for name, values in actions.items()}
+    links = {name: np.array(values, dtype=np.int64) for name, values in links.items()}
+    inputs = {name: np.concatenate(values) if values else np.zeros(0, dtype=np.int64)
+              for name, values in inputs.items()}
+    flags = {name: np.array(values, dtype=bool) for name, values in
+             (('input', has_input), ('canonical', has_canonical), ('title', has_title))}
+    return stories, actions, links, inputs, flags
+
+
+def ratio(numerator, denominator):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator > 0, numerator / np.maximum(denominator, 1), np.nan)
+
+
+def evaluate(digests, store=None, config=None):
+    """Per-digest quality metrics, each a float array indexed like digests.
+
+    Fidelity is NaN for digests whose inputs were not recorded; title
+    fidelity also for partitions written before titles were hashed.
+    """
+    config = config or load_config()
+    store = store or HistoryStore()
+    categories = config['categories']
+    n = len(digests)
+    stories, actions, links, inputs, has = collect(digests, store, categories)
+    sd = stories['digest']
+    has_input = has['input']
+
+    def per_digest(values=None, index=sd):
+        return np.bincount(index, weights=values, minlength=n)[:n]
+
+    n_stories = per_digest()
+    n_actions = per_digest(index=actions['digest'])
+
+    # URL and title fidelity against the run's input items; partitions
+    # without canonical hashes are matched on raw URLs
+    url = np.where(has['canonical'][sd], stories['canonical'], stories['raw'])
+    url_ok = np.isin(keyed(sd, url), keyed(inputs['digest'], inputs['url']))
+    title_ok = url_ok & np.isin(keyed(sd, url ^ (stories['title'] * TITLE_SALT)),
+                                keyed(inputs['digest'], inputs['url'] ^ (inputs['title'] * TITLE_SALT)))
+    url_fidelity = np.where(has_input, ratio(per_digest(url_ok), n_stories), np.nan)
+    title_fidelity = np.where(has['title'], ratio(per_digest(title_ok), per_digest(url_ok)), np.nan)
+
+    # A story is a duplicate when an earlier story in its digest has the same URL or title
+    duplicate = np.ones(len(sd), dtype=bool)
+    first_url = np.unique(keyed(sd, stories['canonical']), return_index=True)[1]
+    duplicate[first_url] = False
+    title_dup = np.ones(len(sd), dtype=bool)
+    title_dup[np.unique(keyed(sd, stories['title']), return_index=True)[1]] = False
+    duplicate |= title_dup
+
+    known = stories['category'] >= 0
+    counts = np.bincount(sd[known] * len(categories) + stories['category'][known],
+                         minlength=n * len(categories)).reshape(n, len(categories))
+    score = stories['score']
+    mean = ratio(per_digest(score), n_stories)
+    variance = ratio(per_digest(score ** 2), n_stories) - mean ** 2
+
+    # Links into stories that are duplicated or not among the inputs
+    bad_story = duplicate | (has_input[sd] & ~url_ok)
+    link_digest = actions['digest'][links['action']]
+    bad_links = np.bincount(link_digest, weights=bad_story[links['story']], minlength=n)[:n]
+
+    return {
+        'stories': n_stories,
+        'actions': n_actions,
+        'url_fidelity': url_fidelity,
+        'title_fidelity': title_fidelity,
+        'duplicate_rate': ratio(per_digest(duplicate), n_stories),
+        'unknown_category_rate': ratio(per_digest(~known), n_stories),
+        'category_share': ratio(counts.max(axis=1) if len(categories) else np.zeros(n), n_stories),
+        'score_out_of_range': ratio(per_digest((score < 1) | (score > 10)), n_stories),
+        'score_mean': mean,
+        'score_std': np.sqrt(np.maximum(variance, 0)),
+        'top_score_share': ratio(per_digest(score >= 10), n_stories),
+        'unlinked_action_rate': ratio(per_digest(actions['links'] == 0, actions['digest']), n_actions),
+        'bad_link_rate': ratio(bad_links, np.bincount(link_digest, minlength=n)[:n]),
+        'category_counts': counts,
+    }
+
+
+# metric, gate key, whether the metric must stay at or above the gate
+CHECKS = [
+    ('stories', 'min_stories', True),
+    ('stories', 'max_stories', False),
+    ('actions', 'min_actions', True),
+    ('actions', 'max_actions', False),
+    ('url_fidelity', 'min_url_fidelity', True),
+    ('title_fidelity', 'min_title_fidelity', True),
+    ('duplicate_rate', 'max_duplicate_rate', False),
+    ('unknown_category_rate', 'max_unknown_category_rate', False),
+    ('category_share', 'max_category_share', False),
+    ('score_out_of_range', 'max_score_out_of_range', False),
+    ('score_std', 'min_score_std', True),
+    ('top_score_share', 'max_top_score_share', False),
+    ('unlinked_action_rate', 'max_unlinked_action_rate', False),
+    ('bad_link_rate', 'max_bad_link_rate', False),
+]
+
+
+def failures(metrics, gates):
+    """{digest index: [failure messages]}; NaN metrics are not gated"""
+    failed = {}
+    for metric, gate, at_least in CHECKS:
+        if gate not in gates:
+            continue
+        values = metrics[metric]
+        with np.errstate(invalid='ignore'):
+            bad = values < gates[gate] if at_least else values > gates[gate]
+        for i in np.flatnonzero(bad):
+            sign = '<' if at_least else '>'
+            value = f"{values[i]:.0f}" if metric in ('stories', 'actions') else f"{values[i]:.2f}"
+            failed.setdefault(int(i), []).append(f"{metric} {value} {sign} {gates[gate]}")
+    return failed
+
+
+def summarize(metrics, categories):
+    lines = []
+    for name in ('url_fidelity', 'title_fidelity', 'duplicate_rate', 'score_mean', 'score_std',
+                 'top_score_share', 'unlinked_action_rate', 'bad_link_rate'):
+        values = metrics[name]
+        measured = values[~np.isnan(values)]
+        if len(measured):
+            lines.append(f"   {name:<22} mean {measured.mean():.2f}  worst "
+                         f"{(measured.min() if 'fidelity' in name else measured.max()):.2f}  ({len(measured)} digests)")
+    totals = metrics['category_counts'].sum(axis=0)
+    if totals.sum():
+        shares = ', '.join(f"{name} {count * 100 / totals.sum():.0f}%"
+                           for name, count in sorted(zip(categories, totals), key=lambda kv: -kv[1]) if count)
+        lines.append(f"   categories             {shares}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline quality checks for digests against their input items")
+    parser.add_argument('--since', help="Gate every digest from this date (YYYY-MM-DD); default: the latest only")
+    parser.add_argument('--all', action='store_true', help="Gate the whole archive")
+    parser.add_argument('--report', help="Write per-digest metrics as JSON to this file")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    config = load_config()
+    digests = list(iter_digests())
+    if not digests:
+        print("❌ No digests found")
+        return 1
+    metrics = evaluate(digests, config=config)
+    failed = failures(metrics, config['gates'])
+
+    if args.all:
+        gated = range(len(digests))
+    elif args.since:
+        gated = [i for i, (date_str, _) in enumerate(digests) if date_str >= args.since]
+    else:
+        gated = [0]
+
+    print(f"📏 Evaluated {len(digests)} digests, {int(metrics['stories'].sum())} stories "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    for line in summarize(metrics, config['categories']):
+        print(line)
+
+    for i in gated:
+        date_str = digests[i][0]
+        if i in failed:
+            print(f"❌ {date_str}: {'; '.join(failed[i])}")
+        else:
+            print(f"✅ {date_str}: {int(metrics['stories'][i])} stories, {int(metrics['actions'][i])} actions")
+
+    if args.report:
+        from output_writer import atomic_write
+        report = {
+            date_str: {name: (None if np.isnan(values[i]) else round(float(values[i]), 4))
+                       for name, values in metrics.items() if values.ndim == 1}
+            for i, (date_str, _) in enumerate(digests)
+        }
+        atomic_write(args.report, json.dumps(report, indent=2))
+
+    return 1 if any(i in failed for i in gated) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+import os
+import glob
+import json
+
+SCHEMA_VERSION = 2
+
+OUTPUT_DIR = 'output'
+BUNDLE_DIR = os.path.join(OUTPUT_DIR, 'bundles')
+
+SMART_DIGEST_FIELDS = {'tldr': str, 'patterns': list, 'signals': list, 'bottom_line': str}
+STORY_FIELDS = {
+    'title': str, 'url': str, 'summary': str, 'relevance_score': (int, float),
+    'why_relevant': str, 'category': str, 'source': str, 'date': str,
+}
+ACTION_FIELDS = {
+    'type': str, 'priority': str, 'title': str, 'description': str,
+    'why_now': str, 'time_estimate': str, 'related_stories': list,
+}
+
+
+class DigestError(ValueError):
+    """A digest that cannot be migrated or fails validation"""
+
+
+try:
+    import orjson
+
+    def dumps(digest):
+        return orjson.dumps(digest)
+
+    loads = orjson.loads
+except ImportError:
+    def dumps(digest):
+        return json.dumps(digest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    loads = json.loads
+
+# New archives use msgpack when it is installed; existing archives keep
+# whichever format they were first written in
+ARCHIVE_EXTS = ('.msgpack', '.json')
+
+try:
+    import msgpack
+
+    ARCHIVE_EXT = '.msgpack'
+
+    def packb(obj):
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def unpackb(data):
+        return msgpack.unpackb(data, raw=False)
+except ImportError:
+    ARCHIVE_EXT = '.json'
+    packb = unpackb = None
+
+
+def _number(value, default=0):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return float(str(value).split('/')[0])
+    except ValueError:
+        return default
+
+
+def _v1_to_v2(digest):
+    """Unversioned digests: fill missing fields and coerce scores/indices"""
+    smart = digest.get('smart_digest') or {}
+    digest['smart_digest'] = {
+        'tldr': smart.get('tldr') or '',
+        'patterns': list(smart.get('patterns') or []),
+        'signals': list(smart.get('signals') or []),
+        'bottom_line': smart.get('bottom_line') or '',
+    }
+    stories = []
+    for story in digest.get('stories') or []:
+        story = dict(story)
+        for field, kind in STORY_FIELDS.items():
+            if field == 'relevance_score':
+                story[field] = _number(story.get(field))
+            elif not isinstance(story.get(field), str):
+                story[field] = '' if story.get(field) is None else str(story[field])
+        stories.append(story)
+    digest['stories'] = stories
+
+    actions = []
+    for action in digest.get('actions') or []:
+        action = dict(action)
+        for field in ACTION_FIELDS:
+            if field == 'related_stories':
+                action[field] = [int(i) for i in action.get(field) or [] if str(i).lstrip('-').isdigit()]
+            elif not isinstance(action.get(field), str):
+                action[field] = '' if action.get(field) is None else str(action[field])
+        actions.append(action)
+    # Models sometimes cite story indices that do not exist
+    for action in actions:
+        action['related_stories'] = [i for i in action['related_stories'] if 0 <= i < len(stories)]
+    digest['actions'] = actions
+    digest['schema_version'] = 2
+    return digest
+
+
+# schema_version -> function upgrading a digest to the next version
+MIGRATIONS = {1: _v1_to_v2}
+
+
+def migrate(digest):
+    """Upgrade a digest in place to SCHEMA_VERSION"""
+    if not isinstance(digest, dict):
+        raise DigestError("Digest must be a JSON object")
+    version = digest.get('schema_version', 1)
+    if not isinstance(version, int) or isinstance(version, bool):
+        raise DigestError(f"schema_version: expected an integer, got {version!r}")
+    if version > SCHEMA_VERSION:
+        raise DigestError(f"Digest schema v{version} is newer than supported v{SCHEMA_VERSION}")
+    while version < SCHEMA_VERSION:
+        if version not in MIGRATIONS:
+            raise DigestError(f"No migration from digest schema v{version}")
+        digest = MIGRATIONS[version](digest)
+        version = digest['schema_version']
+    return digest
+
+
+def _is_index(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_fields(obj, fields, where, errors):
+    if not isinstance(obj, dict):
+        errors.append(f"{where}: expected object")
+        return
+    for field, kind in fields.items():
+        value = obj.get(field)
+        # bool is an int subclass but never a valid score
+        if not isinstance(value, kind) or (kind is not str and isinstance(value, bool)):
+            errors.append(f"{where}.{field}: expected {kind.__name__ if isinstance(kind, type) else 'number'}")
+
+
+def validate(digest):
+    """Errors for a current-version digest; an empty list means valid.
+
+    Plain type checks against the field tables, cheap enough to run on
+    every load.
+    """
+    errors = []
+    if digest.get('schema_version') != SCHEMA_VERSION:
+        errors.append(f"schema_version: expected {SCHEMA_VERSION}")
+    _check_fields(digest.get('smart_digest'), SMART_DIGEST_FIELDS, 'smart_digest', errors)
+    stories = digest.get('stories')
+    actions = digest.get('actions')
+    if not isinstance(stories, list):
+        errors.append("stories: expected list")
+        stories = []
+    if not isinstance(actions, list):
+        errors.append("actions: expected list")
+        actions = []
+    for i, story in enumerate(stories):
+        _check_fields(story, STORY_FIELDS, f"stories[{i}]", errors)
+    for i, action in enumerate(actions):
+        _check_fields(action, ACTION_FIELDS, f"actions[{i}]", errors)
+        for index in action.get('related_stories', []) if isinstance(action, dict) else []:
+            if not _is_index(index) or not 0 <= index < len(stories):
+                errors.append(f"actions[{i}].related_stories: {index!r} out of range")
+    return errors
+
+
+def normalize(digest):
+    """Migrate then validate; raises DigestError on the first few problems"""
+    digest = migrate(digest)
+    errors = validate(digest)
+    if errors:
+        raise DigestError('; '.join(errors[:5]) + (f" (+{len(errors) - 5} more)" if len(errors) > 5 else ''))
+    return digest
+
+
+def load_digest(path):
+    """Read, migrate and validate a digest file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return normalize(decode(path, data))
+
+
+def decode(path, data):
+    """Parse a digest or archive file by its extension"""
+    if path.endswith('.msgpack'):
+        if unpackb is None:
+            raise DigestError(f"{path}: msgpack is not installed (pip install -r requirements_archive.txt)")
+        try:
+            return unpackb(data)
+        except Exception as e:
+            raise DigestError(f"{path}: {e}")
+    try:
+        return loads(data)
+    except ValueError as e:
+        raise DigestError(f"{path}: {e}")
+
+
+def encode(path, obj):
+    if path.endswith('.msgpack'):
+        if packb is None:
+            raise DigestError(f"{path}: msgpack is not installed (pip install -r requirements_archive.txt)")
+        return packb(obj)
+    return dumps(obj)
+
+
+def archive_path(month, bundle_dir=BUNDLE_DIR):
+    """The month's archive: the existing file in either format, else a new one in ARCHIVE_EXT"""
+    for ext in ARCHIVE_EXTS:
+        path = os.path.join(bundle_dir, f'digests-{month}{ext}')
+        if os.path.exists(path):
+            return path
+    return os.path.join(bundle_dir, f'digests-{month}{ARCHIVE_EXT}')
+
+
+def pack_month(month, paths):
+    """Encode loose digest files for one month into its archive.
+
+    Returns (archive path, blob); the path is the month's existing
+    archive when there is one, so days are never split across formats.
+    """
+    target = archive_path(month)
+    existing = read_archive(target)
+    for path in paths:
+        date_str = os.path.basename(path)[len('news-data-'):-len('.json')]
+        existing[date_str] = load_digest(path)
+    return target, encode(target, {'schema_version': SCHEMA_VERSION, 'digests': dict(sorted(existing.items()))})
+
+
+def read_archive(path):
+    """{date: digest} from a monthly archive, or {} when there is none"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'rb') as f:
+        data = f.read()
+    payload = decode(path, data)
+    return {date_str: migrate(digest) for date_str, digest in payload.get('digests', {}).items()}
+
+
+def iter_digests(output_dir=OUTPUT_DIR):
+    """Yield (date, digest) for every stored digest, loose or archived, newest first.
+
+    Each monthly archive is a single read and decode, so batch jobs over
+    months of digests avoid opening one file per day.
+    """
+    loose = {}
+    for path in glob.glob(os.path.join(output_dir, 'news-data-*.json')):
+        loose[os.path.basename(path)[len('news-data-'):-len('.json')]] = path
+    archives = sorted(glob.glob(os.path.join(output_dir, 'bundles', 'digests-*')), reverse=True)
+
+    by_month = {}
+    for date_str in loose:
+        by_month.setdefault(date_str[:7], []).append(date_str)
+    for path in archives:
+        by_month.setdefault(os.path.basename(path)[len('digests-'):len('digests-') + 7], [])
+
+    for month in sorted(by_month, reverse=True):
+        digests = {}
+        for path in archives:
+            if os.path.basename(path).startswith(f'digests-{month}'):
+                try:
+                    digests.update(read_archive(path))
+                except DigestError as e:
+                    print(f"⚠️  Skipping archive {e}")
+        for date_str in by_month[month]:
+            try:
+                digests[date_str] = load_digest(loose[date_str])
+            except DigestError as e:
+                print(f"⚠️  Skipping invalid digest {date_str}: {e}")
+        for date_str in sorted(digests, reverse=True):
+            yield date_str, digests[date_str]
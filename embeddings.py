@@ -0,0 +1,154 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+from categorizer import get_categorizer
+
+CACHE_DIR = 'cache'
+DEFAULT_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+PROFILE_FIELDS = ['projects', 'learning', 'tracking_companies', 'interests']
+
+
+def content_hash(model_name, text):
+    """Cache key for one text under one model"""
+    return hashlib.sha1(f"{model_name}\0{text}".encode('utf-8')).hexdigest()
+
+
+def item_text(item):
+    """Text that represents an item for embedding"""
+    return f"{item.title}. {item.summary[:500]}"
+
+
+class EmbeddingCache:
+    """Content-hash keyed embedding rows stored in a memory-mapped .npy matrix"""
+
+    def __init__(self, model_name, dim, cache_dir=CACHE_DIR):
+        os.makedirs(cache_dir, exist_ok=True)
+        slug = model_name.replace('/', '_')
+        self.matrix_path = os.path.join(cache_dir, f'embeddings-{slug}.npy')
+        self.index_path = os.path.join(cache_dir, f'embeddings-{slug}.json')
+        self.dim = dim
+
+        if os.path.exists(self.index_path) and os.path.exists(self.matrix_path):
+            with open(self.index_path, 'r') as f:
+                self.index = json.load(f)
+            self.matrix = np.load(self.matrix_path, mmap_mode='r+')
+        else:
+            self.index = {}
+            self.matrix = np.lib.format.open_memmap(
+                self.matrix_path, mode='w+', dtype=np.float32, shape=(1024, dim)
+            )
+
+    def lookup(self, hashes):
+        """Row numbers for cached hashes, -1 for misses"""
+        return np.array([self.index.get(h, -1) for h in hashes], dtype=np.int64)
+
+    def add(self, hashes, vectors):
+        start = len(self.index)
+        needed = start + len(hashes)
+        if needed > self.matrix.shape[0]:
+            self._grow(needed)
+        self.matrix[start:needed] = vectors
+        for offset, h in enumerate(hashes):
+            self.index[h] = start + offset
+
+    def _grow(self, needed):
+        capacity = self.matrix.shape[0]
+        while capacity < needed:
+            capacity *= 2
+        tmp_path = self.matrix_path + '.tmp'
+        grown = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=(capacity, self.dim))
+        grown[:len(self.index)] = self.matrix[:len(self.index)]
+        grown.flush()
+        del grown
+        self.matrix = None
+        os.replace(tmp_path, self.matrix_path)
+        self.matrix = np.load(self.matrix_path, mmap_mode='r+')
+
+    def save(self):
+        self.matrix.flush()
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+
+class Embedder:
+    """CPU sentence-embedding model with a persistent content-hash cache"""
+
+    def __init__(self, model_name=DEFAULT_MODEL, cache_dir=CACHE_DIR):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, device='cpu')
+        self.cache = EmbeddingCache(model_name, self.model.get_sentence_embedding_dimension(), cache_dir)
+
+    def embed(self, texts, batch_size=64):
+        """L2-normalized embeddings for texts, computing only cache misses"""
+        hashes = [content_hash(self.model_name, t) for t in texts]
+        rows = self.cache.lookup(hashes)
+
+        missing = np.flatnonzero(rows < 0)
+        if len(missing):
+            # Dedupe so repeated texts in one batch are embedded once
+            unique = {}
+            for i in missing:
+                unique.setdefault(hashes[i], texts[i])
+            vectors = self.model.encode(
+                list(unique.values()), batch_size=batch_size,
+                normalize_embeddings=True, convert_to_numpy=True
+            ).astype(np.float32)
+            self.cache.add(list(unique.keys()), vectors)
+            self.cache.save()
+            rows = self.cache.lookup(hashes)
+
+        return np.asarray(self.cache.matrix[rows])
+
+
+def category_prototypes(embedder):
+    """One normalized vector per category from its name, sources and keywords"""
+    categorizer = get_categorizer()
+    texts = []
+    for category in categorizer.order:
+        terms = [k for k, cats in categorizer.keyword_map.items() if category in cats]
+        terms += [s for s, c in categorizer.source_rules if c == category]
+        texts.append(f"{category}: {', '.join(terms)}" if terms else category)
+    return categorizer.order, embedder.embed(texts)
+
+
+def profile_matrix(embedder, user_config):
+    """Embeddings for every non-empty profile entry"""
+    entries = [e for field in PROFILE_FIELDS for e in user_config.get(field, []) if e.strip()]
+    if not entries:
+        return None
+    return embedder.embed(entries)
+
+
+def score_items(items, user_config, embedder=None):
+    """Annotate items with a semantic category and a 0-1 relevance pre-score.
+
+    Item, category and profile vectors are all unit length, so cosine
+    similarity is a single batched matrix product per stage.
+    """
+    if not items:
+        return items
+    embedder = embedder or Embedder()
+
+    item_vectors = embedder.embed([item_text(item) for item in items])
+
+    names, prototypes = category_prototypes(embedder)
+    best_category = (item_vectors @ prototypes.T).argmax(axis=1)
+
+    profile = profile_matrix(embedder, user_config)
+    if profile is not None:
+        relevance = (item_vectors @ profile.T).max(axis=1)
+        relevance = np.clip((relevance + 1) / 2, 0, 1)
+    else:
+        relevance = np.zeros(len(items), dtype=np.float32)
+
+    for item, cat_idx, rel in zip(items, best_category, relevance):
+        item.semantic_category = names[cat_idx]
+        item.relevance_prescore = round(float(rel), 4)
+
+    return items
@@ -0,0 +1,125 @@
+import re
+import json
+
+ENTITIES_FILE = 'entities.json'
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+
+END = '\0'
+
+
+def tokenize(text):
+    """Lowercase word tokens; keeps names like gpt-5, c++ and next.js whole"""
+    return TOKEN_RE.findall(text.lower())
+
+
+class EntityMatcher:
+    """Token trie over entity names and aliases with longest-match lookup.
+
+    Each item is tokenized once and walked left to right, so matching cost
+    depends on the text length, not on how many entities are tracked.
+    """
+
+    def __init__(self):
+        self.trie = {}
+        self.names = []
+        self.kinds = []
+        self.ids = {}
+
+    @classmethod
+    def from_file(cls, path=ENTITIES_FILE):
+        matcher = cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            for kind, entries in json.load(f).items():
+                for name, aliases in entries.items():
+                    matcher.add(name, kind, aliases)
+        return matcher
+
+    def add(self, name, kind, aliases=()):
+        """Register an entity (idempotent) and return its id"""
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.kinds.append(kind)
+        entity_id = self.ids[name]
+
+        for alias in [name, *aliases]:
+            tokens = tokenize(alias)
+            if not tokens:
+                continue
+            node = self.trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(END, entity_id)
+        return entity_id
+
+    def match_ids(self, text):
+        """Entity ids mentioned in text, in first-mention order"""
+        tokens = tokenize(text)
+        found = {}
+        i = 0
+        while i < len(tokens):
+            node = self.trie.get(tokens[i])
+            best, best_end = None, i
+            j = i
+            while node is not None:
+                if END in node:
+                    best, best_end = node[END], j
+                j += 1
+                node = node.get(tokens[j]) if j < len(tokens) else None
+            if best is not None:
+                found.setdefault(best, None)
+                i = best_end + 1
+            else:
+                i += 1
+        return list(found)
+
+    def match(self, text):
+        return [self.names[i] for i in self.match_ids(text)]
+
+
+def build_matcher(items=(), user_config=None):
+    """Dictionary entities plus tracked companies and today's trending repos"""
+    matcher = EntityMatcher.from_file()
+    for company in (user_config or {}).get('tracking_companies', []):
+        if company.strip():
+            matcher.add(company.strip(), 'company')
+    for item in items:
+        if item.source == 'GitHub Trending' and '/' in item.title:
+            matcher.add(item.title, 'repo')
+    return matcher
+
+
+def annotate_items(items, matcher):
+    """Set item.entities and return the entity -> item positions index"""
+    index = {}
+    for position, item in enumerate(items):
+        names = matcher.match(f"{item.title} {item.summary}")
+        item.entities = names or None
+        for name in names:
+            index.setdefault(name, []).append(position)
+    return index
+
+
+def resolve_tracked(matcher, user_config):
+    """Canonical entity names for the profile's tracked companies"""
+    tracked = []
+    for company in user_config.get('tracking_companies', []):
+        ids = matcher.match_ids(company)
+        if ids:
+            tracked.append(matcher.names[ids[0]])
+    return list(dict.fromkeys(tracked))
+
+
+def tracked_hits(index, tracked):
+    """Mention counts for tracked companies, most mentioned first"""
+    hits = {name: len(index.get(name, [])) for name in tracked}
+    return {name: count for name, count in sorted(hits.items(), key=lambda kv: kv[1], reverse=True) if count}
+
+
+def boost_tracked(items, tracked):
+    """Stable re-order putting items that mention a tracked company first"""
+    tracked = set(tracked)
+    if not tracked:
+        return items
+    return sorted(items, key=lambda item: not (item.entities and tracked.intersection(item.entities)))
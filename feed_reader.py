@@ -0,0 +1,158 @@
+import xml.etree.ElementTree as ET
+
+from news_item import to_epoch
+
+MAX_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 16 * 1024
+# How often a malformed feed is re-parsed to see whether enough has arrived
+LENIENT_STEP = 256 * 1024
+# Feeds are newest first in practice; this many dated entries in a row past
+# the cutoff ends the read, so one out-of-order entry doesn't cut it short
+STALE_RUN = 5
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+RSS1 = '{http://purl.org/rss/1.0/}'
+DC = '{http://purl.org/dc/elements/1.1/}'
+CONTENT = '{http://purl.org/rss/1.0/modules/content/}'
+
+ENTRY_TAGS = frozenset(['item', f'{RSS1}item', f'{ATOM}entry'])
+
+
+def child_text(elem, *tags):
+    """Text of the first of tags present on elem, including nested markup"""
+    for tag in tags:
+        child = elem.find(tag)
+        if child is not None:
+            text = ''.join(child.itertext()).strip()
+            if text:
+                return text
+    return ''
+
+
+def entry_link(elem):
+    for tag in ('link', f'{RSS1}link'):
+        link = elem.find(tag)
+        if link is not None and (link.text or '').strip():
+            return link.text.strip()
+    fallback = ''
+    for link in elem.iter(f'{ATOM}link'):
+        if link.get('rel', 'alternate') == 'alternate':
+            return link.get('href', '')
+        fallback = fallback or link.get('href', '')
+    return fallback
+
+
+def parse_entry(elem):
+    """Raw dict for one RSS 2.0, RSS 1.0 or Atom entry"""
+    return {
+        'title': child_text(elem, 'title', f'{RSS1}title', f'{ATOM}title'),
+        'link': entry_link(elem),
+        'summary': child_text(elem, 'description', f'{RSS1}description', f'{ATOM}summary',
+                              f'{CONTENT}encoded', f'{ATOM}content'),
+        'published': to_epoch(child_text(elem, 'pubDate', f'{DC}date', f'{ATOM}published', f'{ATOM}updated')),
+    }
+
+
+class FeedStream:
+    """Incremental feed parser: bytes go in, entries come out as they close.
+
+    Each finished entry is detached from the tree as soon as it is parsed,
+    so memory is proportional to the entries kept, not to the document.
+    """
+
+    def __init__(self, cutoff=0, limit=10):
+        self.cutoff = cutoff
+        self.limit = limit
+        self.parser = ET.XMLPullParser(events=('start', 'end'))
+        self.stack = []
+        self.entries = []
+        self.stale = 0
+        self.done = False
+
+    def feed(self, data):
+        self.parser.feed(data)
+        for event, elem in self.parser.read_events():
+            if event == 'start':
+                self.stack.append(elem)
+                continue
+            self.stack.pop()
+            if elem.tag not in ENTRY_TAGS:
+                continue
+            self.accept(parse_entry(elem))
+            if self.stack:
+                self.stack[-1].remove(elem)
+            if self.done:
+                return
+
+    def accept(self, entry):
+        if entry['published'] and entry['published'] < self.cutoff:
+            self.stale += 1
+            self.done = self.stale >= STALE_RUN
+            return
+        self.stale = 0
+        if entry['title'] and entry['link']:
+            self.entries.append(entry)
+        self.done = len(self.entries) >= self.limit
+
+
+def read_feed(url, cutoff=0, limit=10, max_bytes=MAX_BYTES, timeout=15):
+    """Entries from a feed URL, newest first, read only as far as needed.
+
+    The download stops as soon as limit entries newer than cutoff (UTC
+    epoch) are kept, a run of entries is older than cutoff, or max_bytes
+    have been received. Documents that are not well-formed XML keep
+    downloading under the same rules and are parsed by feedparser, so the
+    received bytes are held (at most max_bytes).
+    """
+    import requests
+
+    stream = FeedStream(cutoff, limit)
+    received = 0
+    chunks = []
+    lenient = False
+    checked = 0
+    with requests.get(url, stream=True, timeout=timeout, headers={'User-Agent': 'news-agent/1.0'}) as response:
+        response.raise_for_status()
+        for chunk in response.iter_content(CHUNK_SIZE):
+            received += len(chunk)
+            chunks.append(chunk)
+            if not lenient:
+                try:
+                    stream.feed(chunk)
+                except ET.ParseError as e:
+                    print(f"    ⚠️  {url}: malformed feed after {len(stream.entries)} entries ({e}), using feedparser")
+                    lenient = True
+                    checked = received
+                if stream.done:
+                    break
+            elif received - checked >= LENIENT_STEP:
+                checked = received
+                # One spare entry shows the first limit entries arrived complete
+                if lenient_entries(b''.join(chunks), cutoff, limit + 1)[1]:
+                    break
+            if received >= max_bytes:
+                print(f"    ⚠️  {url}: stopped at the {max_bytes // 1024} KB download limit")
+                break
+    if lenient:
+        return lenient_entries(b''.join(chunks), cutoff, limit)[0]
+    return stream.entries
+
+
+def lenient_entries(data, cutoff, limit):
+    """feedparser for feeds that are not well-formed XML (HTML entities, bad escapes).
+
+    Returns (entries, done) under the same cutoff and limit rules as FeedStream.
+    """
+    import feedparser
+
+    stream = FeedStream(cutoff, limit)
+    for entry in feedparser.parse(data).entries:
+        stream.accept({
+            'title': entry.get('title', ''),
+            'link': entry.get('link', ''),
+            'summary': entry.get('summary', ''),
+            'published': to_epoch(entry.get('published_parsed') or entry.get('updated_parsed')),
+        })
+        if stream.done:
+            break
+    return stream.entries, stream.done
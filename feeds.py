@@ -0,0 +1,167 @@
+import os
+import glob
+import json
+from html import escape
+from datetime import datetime, timedelta, timezone
+
+from news_item import story_id
+
+FEEDS_DIR = os.path.join('output', 'feeds')
+ROLLING_DAYS = 7
+ROLLING_LIMIT = 100
+# Per-digest feeds older than this are deleted; the rolling feeds cover recent days
+DIGEST_FEED_DAYS = 30
+FEED_TITLE = 'Tech News Daily'
+
+
+def feed_item(story, digest_date):
+    """Format-neutral feed item built once and serialized to every format"""
+    sid = story.get('id') or story_id(story.get('url') or story.get('title', ''))
+    published = story.get('date') or digest_date
+    try:
+        stamp = datetime.strptime(published[:10], '%Y-%m-%d')
+    except ValueError:
+        stamp = datetime.strptime(digest_date, '%Y-%m-%d')
+    return {
+        'id': f"urn:news-agent:story:{sid}",
+        'title': story.get('title', ''),
+        'url': story.get('url', ''),
+        'summary': story.get('summary', ''),
+        'why_relevant': story.get('why_relevant', ''),
+        'source': story.get('source', ''),
+        'tags': [t for t in [story.get('category'), *(story.get('entities') or [])] if t],
+        'relevance_score': story.get('relevance_score'),
+        # Content dates, never the render time, so unchanged digests
+        # serialize to identical bytes and keep their Last-Modified
+        'published': stamp.replace(hour=7, tzinfo=timezone.utc).isoformat().replace('+00:00', 'Z'),
+        'digest_date': digest_date,
+    }
+
+
+def digest_items(digest, digest_date):
+    return [feed_item(story, digest_date) for story in digest.get('stories', [])]
+
+
+def to_json_feed(items, title, feed_url, home_url):
+    feed = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': title,
+        'home_page_url': home_url,
+        'feed_url': feed_url,
+        'items': [
+            {
+                'id': item['id'],
+                'url': item['url'],
+                'title': item['title'],
+                'content_text': item['summary'] + (f"\n\nWhy it matters: {item['why_relevant']}" if item['why_relevant'] else ''),
+                'summary': item['summary'],
+                'date_published': item['published'],
+                'tags': item['tags'],
+                'authors': [{'name': item['source']}] if item['source'] else [],
+                '_news_agent': {'relevance_score': item['relevance_score'], 'digest_date': item['digest_date']},
+            }
+            for item in items
+        ],
+    }
+    return json.dumps(feed, ensure_ascii=False, indent=1)
+
+
+def to_atom(items, title, feed_id, self_url, home_url):
+    updated = max((item['published'] for item in items), default='1970-01-01T00:00:00Z')
+    entries = []
+    for item in items:
+        content = f"<p>{escape(item['summary'])}</p>"
+        if item['why_relevant']:
+            content += f"<p><strong>Why it matters:</strong> {escape(item['why_relevant'])}</p>"
+        entries.append(
+            '  <entry>\n'
+            f'    <id>{item["id"]}</id>\n'
+            f'    <title>{escape(item["title"])}</title>\n'
+            f'    <link href="{escape(item["url"])}"/>\n'
+            f'    <updated>{item["published"]}</updated>\n'
+            + (f'    <author><name>{escape(item["source"])}</name></author>\n' if item['source'] else '')
+            + ''.join(f'    <category term="{escape(tag)}"/>\n' for tag in item['tags'])
+            + f'    <summary>{escape(item["summary"])}</summary>\n'
+            f'    <content type="html">{escape(content)}</content>\n'
+            '  </entry>\n'
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+        f'  <id>{feed_id}</id>\n'
+        f'  <title>{escape(title)}</title>\n'
+        f'  <updated>{updated}</updated>\n'
+        f'  <link rel="self" href="{escape(self_url)}"/>\n'
+        f'  <link rel="alternate" href="{escape(home_url)}"/>\n'
+        f'  <author><name>{FEED_TITLE}</name></author>\n'
+        + ''.join(entries)
+        + '</feed>\n'
+    )
+
+
+def rolling_items(digest, date_str):
+    """Stories from today's digest and the previous ROLLING_DAYS digests"""
+    from digest_format import iter_digests
+
+    items = digest_items(digest, date_str)
+    seen = {item['id'] for item in items}
+    days = 1
+    for other_date, other in iter_digests():
+        if days >= ROLLING_DAYS or len(items) >= ROLLING_LIMIT:
+            break
+        if other_date >= date_str:
+            continue
+        days += 1
+        for item in digest_items(other, other_date):
+            if item['id'] not in seen:
+                seen.add(item['id'])
+                items.append(item)
+    return items[:ROLLING_LIMIT]
+
+
+def feed_artifacts(digest, date_str):
+    """{path: content} for the day's Atom/JSON feeds and the rolling feeds.
+
+    Empty when no site URL is known, since feed links must be absolute.
+    """
+    from update_index import SITE_URL
+
+    if not SITE_URL:
+        print("⚠️  NEWS_SITE_URL not set - skipping story feeds")
+        return {}
+    base = f"{SITE_URL}/{FEEDS_DIR.replace(os.sep, '/')}"
+    # publish.build_site renders every archived day, packed or not, so this page stays up
+    home = f"{SITE_URL}/output/news-summary-{date_str}.html"
+    day_title = f"{FEED_TITLE} - {date_str}"
+    items = digest_items(digest, date_str)
+    rolling = rolling_items(digest, date_str)
+    rolling_title = f"{FEED_TITLE} - last {ROLLING_DAYS} days"
+
+    return {
+        os.path.join(FEEDS_DIR, f'digest-{date_str}.atom'): to_atom(
+            items, day_title, f"urn:news-agent:digest:{date_str}", f"{base}/digest-{date_str}.atom", home),
+        os.path.join(FEEDS_DIR, f'digest-{date_str}.json'): to_json_feed(
+            items, day_title, f"{base}/digest-{date_str}.json", home),
+        os.path.join(FEEDS_DIR, 'stories.atom'): to_atom(
+            rolling, rolling_title, "urn:news-agent:stories", f"{base}/stories.atom", f"{SITE_URL}/"),
+        os.path.join(FEEDS_DIR, 'stories.json'): to_json_feed(
+            rolling, rolling_title, f"{base}/stories.json", f"{SITE_URL}/"),
+    }
+
+
+def prune_feeds(date_str, keep_days=DIGEST_FEED_DAYS):
+    """Delete per-digest feeds older than keep_days before date_str"""
+    from publish import Manifest
+
+    cutoff = (datetime.strptime(date_str, '%Y-%m-%d') - timedelta(days=keep_days)).strftime('%Y-%m-%d')
+    manifest = Manifest()
+    removed = 0
+    for path in glob.glob(os.path.join(FEEDS_DIR, 'digest-*')):
+        if os.path.basename(path)[len('digest-'):].rsplit('.', 1)[0] < cutoff:
+            os.remove(path)
+            manifest.forget(path)
+            removed += 1
+    if removed:
+        manifest.save()
+        print(f"🧹 Removed {removed} per-digest feeds older than {cutoff}")
+    return removed
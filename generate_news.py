@@ -1,166 +1,32 @@
 import os
-import requests
-import feedparser
 import json
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime
+
+from config_cache import load_user_config
+from categorizer import get_categorizer
+from news_item import normalize_items
+from sources import load_sources, fetch_all
+from recency import filter_recent
+from output_writer import OutputTransaction
+from llm_client import get_scheduler
 
 def fetch_user_config():
     """Fetch user configuration from Cloudflare Worker"""
-    api_endpoint = os.environ.get('CONFIG_API_ENDPOINT')
-    api_key = os.environ.get('CONFIG_API_KEY')
-    
-    if not api_endpoint or not api_key:
-        print("⚠️  No config API set, using defaults")
-        return {
-            'projects': [],
-            'learning': [],
-            'tracking_companies': [],
-            'role': 'Developer',
-            'interests': []
-        }
-    
-    try:
-        response = requests.get(
-            f"{api_endpoint}/config",
-            headers={'Authorization': f'Bearer {api_key}'},
-            timeout=10
-        )
-        response.raise_for_status()
-        config = response.json()
-        print(f"✅ Loaded user config: {len(config.get('projects', []))} projects, {len(config.get('learning', []))} learning topics")
-        return config
-    except Exception as e:
-        print(f"⚠️  Could not fetch config: {e}")
-        return {
-            'projects': [],
-            'learning': [],
-            'tracking_companies': [],
-            'role': 'Developer',
-            'interests': []
-        }
-
-def fetch_rss_feed(url, source_name):
-    """Fetch and parse RSS feed"""
-    try:
-        feed = feedparser.parse(url)
-        items = []
-        
-        cutoff_date = datetime.now() - timedelta(hours=48)
-        
-        for entry in feed.entries[:10]:
-            pub_date = None
-            if hasattr(entry, 'published_parsed'):
-                pub_date = datetime(*entry.published_parsed[:6])
-            elif hasattr(entry, 'updated_parsed'):
-                pub_date = datetime(*entry.updated_parsed[:6])
-            
-            if pub_date and pub_date > cutoff_date:
-                items.append({
-                    'title': entry.title,
-                    'link': entry.link,
-                    'summary': entry.get('summary', ''),
-                    'published': pub_date,
-                    'source': source_name
-                })
-        
-        return items
-    except Exception as e:
-        print(f"Error fetching {source_name}: {e}")
-        return []
-
-def fetch_github_trending():
-    """Fetch trending AI repos from GitHub"""
-    try:
-        query = "ai OR machine-learning OR llm created:>{}".format(
-            (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        )
-        
-        response = requests.get(
-            "https://api.github.com/search/repositories",
-            params={
-                'q': query,
-                'sort': 'stars',
-                'order': 'desc',
-                'per_page': 10
-            },
-            headers={'Accept': 'application/vnd.github.v3+json'}
-        )
-        
-        repos = []
-        if response.status_code == 200:
-            data = response.json()
-            for repo in data['items']:
-                repos.append({
-                    'title': repo['full_name'],
-                    'link': repo['html_url'],
-                    'summary': repo['description'] or 'No description',
-                    'stars': repo['stargazers_count'],
-                    'source': 'GitHub Trending'
-                })
-        
-        return repos
-    except Exception as e:
-        print(f"Error fetching GitHub trending: {e}")
-        return []
+    return load_user_config()
 
 def aggregate_all_sources():
     """Aggregate content from all sources"""
     print("Fetching from multiple sources...")
     
-    all_items = defaultdict(list)
-    
-    rss_sources = {
-        'Anthropic Blog': 'https://www.anthropic.com/news',
-        'OpenAI Blog': 'https://openai.com/blog/rss.xml',
-        'Google AI Blog': 'http://ai.googleblog.com/feeds/posts/default',
-        'Microsoft AI Blog': 'https://blogs.microsoft.com/ai/feed/',
-        'Hugging Face': 'https://huggingface.co/blog/feed.xml',
-        'TechCrunch AI': 'https://techcrunch.com/category/artificial-intelligence/feed/',
-        'The Verge': 'https://www.theverge.com/rss/index.xml',
-        'GitHub Blog': 'https://github.blog/feed/',
-    }
-    
-    for name, url in rss_sources.items():
-        print(f"  Fetching {name}...")
-        items = fetch_rss_feed(url, name)
-        if items:
-            all_items['rss'].extend(items)
-            print(f"    Found {len(items)} items")
+    adapters, max_workers = load_sources()
+    all_items = fetch_all(adapters, max_workers)
     
-    print("  Fetching GitHub trending...")
-    github_items = fetch_github_trending()
-    if github_items:
-        all_items['github'].extend(github_items)
-        print(f"    Found {len(github_items)} repos")
-    
-    return all_items
+    return {item_type: filter_recent(normalize_items(items)) for item_type, items in all_items.items()}
 
 def categorize_items(all_items):
     """Organize items by category"""
-    categories = {
-        'AI Companies': [],
-        'Developer Tools': [],
-        'GitHub Trending': [],
-        'General Tech News': []
-    }
-    
-    for item_type, items in all_items.items():
-        for item in items:
-            source = item.get('source', '')
-            title = item.get('title', '').lower()
-            summary = item.get('summary', '').lower()
-            
-            if any(x in source for x in ['Anthropic', 'OpenAI', 'Google AI', 'Microsoft AI', 'Hugging Face']):
-                categories['AI Companies'].append(item)
-            elif source == 'GitHub Trending':
-                categories['GitHub Trending'].append(item)
-            elif any(x in title + summary for x in ['vscode', 'cursor', 'github', 'copilot', 'ide', 'developer']):
-                categories['Developer Tools'].append(item)
-            else:
-                categories['General Tech News'].append(item)
-    
-    return categories
+    categorizer = get_categorizer()
+    return categorizer.categorize(item for items in all_items.values() for item in items)
 
 def generate_enhanced_summary(categorized_items, user_config):
     """Generate enhanced summary with 3 layers using Claude"""
@@ -177,9 +43,9 @@ def generate_enhanced_summary(categorized_items, user_config):
         if items:
             context += f"\n## {category}:\n"
             for item in items[:5]:
-                context += f"- {item['title']}\n"
-                context += f"  Link: {item['link']}\n"
-                context += f"  Source: {item['source']}\n\n"
+                context += f"- {item.title}\n"
+                context += f"  Link: {item.url}\n"
+                context += f"  Source: {item.source}\n\n"
     
     # Build user context
     user_context = f"""
@@ -315,33 +181,17 @@ CRITICAL REQUIREMENTS:
 Begin generating the HTML now."""
 
     try:
-        response = requests.post(
-            "https://api.perplexity.ai/chat/completions",
-            headers={
-                "Authorization": f"Bearer {perplexity_api_key}",
-                "Content-Type": "application/json"
+        messages = [
+            {
+                "role": "system",
+                "content": "You are an expert news analyst creating personalized, actionable insights."
             },
-            json={
-                "model": "sonar-pro",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are an expert news analyst creating personalized, actionable insights."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "temperature": 0.3,
-                "max_tokens": 12000
+            {
+                "role": "user",
+                "content": prompt
             }
-        )
-        
-        response.raise_for_status()
-        result = response.json()
-        
-        html_content = result['choices'][0]['message']['content']
+        ]
+        html_content = get_scheduler().complete(messages, max_tokens=12000, temperature=0.3)
         
         # Clean up
         if "```html" in html_content:
@@ -383,11 +233,9 @@ def main():
     timestamp = datetime.now().strftime("%Y-%m-%d")
     filename = f"output/news-summary-{timestamp}.html"
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    with open("output/latest.html", 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    with OutputTransaction() as out:
+        out.write(filename, html_content)
+        out.write("output/latest.html", html_content)
     
     print(f"\n✅ Success! Generated {filename}")
     print("📊 Includes: Smart Digest + Personalization + Action Items")
@@ -0,0 +1,226 @@
+import os
+import re
+import json
+import time
+import threading
+import requests
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from news_item import to_epoch
+
+SEARCH_URL = 'https://api.github.com/search/repositories'
+CACHE_DIR = 'cache'
+
+TOPIC_QUERIES = [
+    'ai OR machine-learning OR llm',
+    'topic:llm',
+    'topic:ai-agents',
+    'topic:generative-ai',
+]
+
+HISTORY_DAYS = 30
+
+# Search pages are keyed by their created:> date, which moves every day
+SINCE_RE = re.compile(r'created:>(\d{4}-\d{2}-\d{2})')
+
+REPO_FIELDS = ['full_name', 'html_url', 'description', 'stargazers_count', 'created_at']
+
+
+class TokenBucket:
+    """Rate limiter for one source, named in its wait messages.
+
+    Starts with a conservative local budget. For GitHub it is corrected
+    from every response's X-RateLimit-* headers, so concurrent workers never
+    overrun the window the API reports.
+    """
+
+    def __init__(self, capacity=10, period=60, name='GitHub'):
+        self.name = name
+        self.capacity = capacity
+        self.tokens = capacity
+        self.period = period
+        self.reset_at = time.time() + period
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.time()
+                if now >= self.reset_at:
+                    self.tokens = self.capacity
+                    self.reset_at = now + self.period
+                if self.tokens > 0:
+                    self.tokens -= 1
+                    return
+                wait = self.reset_at - now
+            print(f"    ⏳ {self.name} rate limit reached, waiting {wait:.0f}s")
+            time.sleep(min(wait, 60) + 0.5)
+
+    def update(self, headers):
+        limit = headers.get('X-RateLimit-Limit')
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if limit is None or remaining is None or reset is None:
+            return
+        with self.lock:
+            self.capacity = int(limit)
+            self.tokens = min(self.tokens, int(remaining))
+            self.reset_at = float(reset)
+
+
+class JsonStore:
+    """Small JSON document persisted under cache/"""
+
+    def __init__(self, name, cache_dir=CACHE_DIR):
+        self.path = os.path.join(cache_dir, name)
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.data = {}
+
+    def save(self):
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f)
+            os.replace(tmp_path, self.path)
+
+
+class GitHubCollector:
+    """Concurrent, paginated, ETag-conditional GitHub search collector"""
+
+    def __init__(self, token=None, queries=None, per_page=30, max_pages=2, max_workers=4, bucket=None):
+        self.token = token if token is not None else os.environ.get('GITHUB_TOKEN')
+        self.queries = queries or TOPIC_QUERIES
+        self.per_page = per_page
+        self.max_pages = max_pages
+        self.max_workers = max_workers
+        # Search API: 30 requests/minute authenticated, 10 without
+        self.bucket = bucket or TokenBucket(capacity=30 if self.token else 10)
+        self.etags = JsonStore('github-etags.json')
+        self.stars = JsonStore('github-stars.json')
+        self.session = requests.Session()
+        self.session.headers['Accept'] = 'application/vnd.github.v3+json'
+        if self.token:
+            self.session.headers['Authorization'] = f'Bearer {self.token}'
+
+    def get(self, url, params=None):
+        """Conditional GET; a 304 replays the cached body without spending quota"""
+        cache_key = url + '?' + '&'.join(f'{k}={v}' for k, v in sorted((params or {}).items()))
+        cached = self.etags.data.get(cache_key)
+        headers = {'If-None-Match': cached['etag']} if cached else {}
+
+        self.bucket.acquire()
+        response = self.session.get(url, params=params, headers=headers, timeout=15)
+        self.bucket.update(response.headers)
+
+        if response.status_code == 304 and cached:
+            return cached['body'], response.links
+        response.raise_for_status()
+
+        body = response.json()
+        if 'items' in body:
+            # Keep cached search pages small: only the fields we use
+            body = {'items': [{k: repo.get(k) for k in REPO_FIELDS} for repo in body['items']]}
+        etag = response.headers.get('ETag')
+        if etag:
+            with self.etags.lock:
+                self.etags.data[cache_key] = {'etag': etag, 'body': body}
+        return body, response.links
+
+    @staticmethod
+    def search_since():
+        return (datetime.now(timezone.utc) - timedelta(days=7)).strftime('%Y-%m-%d')
+
+    def search(self, query):
+        """All pages for one query, stopping early when results run out"""
+        params = {
+            'q': f'{query} created:>{self.search_since()}',
+            'sort': 'stars',
+            'order': 'desc',
+            'per_page': self.per_page,
+        }
+        repos = []
+        for page in range(1, self.max_pages + 1):
+            body, links = self.get(SEARCH_URL, dict(params, page=page))
+            repos.extend(body.get('items', []))
+            if 'next' not in links:
+                break
+        return repos
+
+    def record_stars(self, repos, now):
+        """Append a star snapshot per repo and trim history older than HISTORY_DAYS.
+
+        Repos with no snapshot inside the window have left the search
+        results for good and are dropped.
+        """
+        horizon = now - HISTORY_DAYS * 86400
+        with self.stars.lock:
+            for repo in repos:
+                history = self.stars.data.setdefault(repo['full_name'], [])
+                if not history or history[-1][0] < now - 3600:
+                    history.append([now, repo['stargazers_count']])
+            for name, history in list(self.stars.data.items()):
+                history = [s for s in history if s[0] >= horizon]
+                if history:
+                    self.stars.data[name] = history
+                else:
+                    del self.stars.data[name]
+
+    def prune_etags(self, since):
+        """Drop cached search pages for created:> dates that will not be queried again"""
+        with self.etags.lock:
+            for key in list(self.etags.data):
+                match = SINCE_RE.search(key)
+                if match and match.group(1) < since:
+                    del self.etags.data[key]
+
+    def star_velocity(self, repo, now):
+        """Stars per day from snapshot history, or since creation when history is thin"""
+        history = self.stars.data.get(repo['full_name'], [])
+        if len(history) >= 2 and history[-1][0] > history[0][0]:
+            (t0, s0), (t1, s1) = history[0], history[-1]
+            return (s1 - s0) / ((t1 - t0) / 86400)
+        age_days = max((now - to_epoch(repo['created_at'])) / 86400, 1)
+        return repo['stargazers_count'] / age_days
+
+    def collect(self, limit=10):
+        """Trending repos across all queries, ranked by star velocity"""
+        now = int(time.time())
+        seen = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for result in pool.map(self._search_safe, self.queries):
+                for repo in result:
+                    seen.setdefault(repo['full_name'], repo)
+
+        repos = list(seen.values())
+        self.record_stars(repos, now)
+        self.prune_etags(self.search_since())
+        self.etags.save()
+        self.stars.save()
+
+        ranked = sorted(repos, key=lambda r: self.star_velocity(r, now), reverse=True)[:limit]
+        items = []
+        for repo in ranked:
+            velocity = self.star_velocity(repo, now)
+            items.append({
+                'title': repo['full_name'],
+                'link': repo['html_url'],
+                'summary': repo['description'] or 'No description',
+                'stars': repo['stargazers_count'],
+                'star_velocity': round(velocity, 1),
+                'source': 'GitHub Trending',
+                'published': repo['created_at']
+            })
+        return items
+
+    def _search_safe(self, query):
+        try:
+            return self.search(query)
+        except Exception as e:
+            print(f"    ⚠️  GitHub query '{query}' failed: {e}")
+            return []
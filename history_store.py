@@ -0,0 +1,193 @@
+import os
+import glob
+import json
+import hashlib
+from datetime import datetime, timezone
+import numpy as np
+
+from entities import tokenize
+from news_item import canonical_url
+
+HISTORY_DIR = os.path.join('cache', 'history')
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have how in into is it its new of on or our out over that the this
+to up us using via vs was we what when why will with you your after all can just more now than about
+""".split())
+
+ITEM_COLUMNS = ['published', 'day', 'source', 'category', 'url_hash']
+MENTION_COLUMNS = ['term', 'entity']
+
+
+def extract_terms(text):
+    """Lowercase unigrams and bigrams, stopwords removed, unique per item"""
+    words = [w for w in tokenize(text) if len(w) > 1 and not w.isdigit()]
+    terms = [w for w in words if w not in STOPWORDS]
+    bigrams = [
+        f"{a} {b}" for a, b in zip(words, words[1:])
+        if a not in STOPWORDS and b not in STOPWORDS
+    ]
+    return list(dict.fromkeys(terms + bigrams))
+
+
+def url_hash(url):
+    return int.from_bytes(hashlib.sha1(url.encode('utf-8')).digest()[:8], 'little', signed=True)
+
+
+def title_hash(title):
+    """Hash of a title's tokens, so case, spacing and punctuation don't matter"""
+    return url_hash(' '.join(tokenize(title or '')))
+
+
+def epoch_day(epoch):
+    return int(epoch // 86400)
+
+
+def date_to_day(date_str):
+    return epoch_day(datetime.strptime(date_str, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp())
+
+
+def day_to_date(day):
+    return datetime.fromtimestamp(day * 86400, timezone.utc).strftime('%Y-%m-%d')
+
+
+class HistoryStore:
+    """Columnar item history, one compressed .npz partition per run date.
+
+    Strings (sources, categories, terms, entities) are dictionary-encoded into
+    a shared vocab.json so partitions hold only integer columns. Term and
+    entity mentions are stored CSR-style: term_ids[term_offsets[i]:
+    term_offsets[i + 1]] are the terms of item i.
+    """
+
+    def __init__(self, directory=HISTORY_DIR):
+        self.directory = directory
+        self.vocab_path = os.path.join(directory, 'vocab.json')
+        try:
+            with open(self.vocab_path, 'r', encoding='utf-8') as f:
+                self.vocab = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.vocab = {'sources': [], 'categories': [], 'terms': []}
+        self.index = {kind: {v: i for i, v in enumerate(values)} for kind, values in self.vocab.items()}
+
+    def intern(self, kind, value):
+        ids = self.index.setdefault(kind, {})
+        if value not in ids:
+            ids[value] = len(ids)
+            self.vocab.setdefault(kind, []).append(value)
+        return ids[value]
+
+    def partition_path(self, date_str):
+        return os.path.join(self.directory, f'items-{date_str}.npz')
+
+    def write_day(self, date_str, items, categories):
+        """Store one run's items; rewriting a date replaces its partition"""
+        from output_writer import atomic_write
+
+        run_day = date_to_day(date_str)
+        term_ids, term_offsets = [], [0]
+        entity_ids, entity_offsets = [], [0]
+        for item in items:
+            term_ids.extend(self.intern('terms', t) for t in extract_terms(item.title))
+            term_offsets.append(len(term_ids))
+            entity_ids.extend(self.intern('entities', e) for e in item.entities or [])
+            entity_offsets.append(len(entity_ids))
+
+        columns = {
+            'published': np.array([item.published for item in items], dtype=np.int64),
+            'day': np.array([epoch_day(item.published) if item.published else run_day for item in items], dtype=np.int32),
+            'source': np.array([self.intern('sources', item.source) for item in items], dtype=np.int32),
+            'category': np.array([self.intern('categories', c) for c in categories], dtype=np.int32),
+            'url_hash': np.array([url_hash(item.url) for item in items], dtype=np.int64),
+            # Input fingerprints for digest_eval; not part of ITEM_COLUMNS
+            'canonical_hash': np.array([url_hash(canonical_url(item.url)) for item in items], dtype=np.int64),
+            'title_hash': np.array([title_hash(item.title) for item in items], dtype=np.int64),
+            'term_offsets': np.array(term_offsets, dtype=np.int64),
+            'term_ids': np.array(term_ids, dtype=np.int32),
+            'entity_offsets': np.array(entity_offsets, dtype=np.int64),
+            'entity_ids': np.array(entity_ids, dtype=np.int32),
+        }
+
+        os.makedirs(self.directory, exist_ok=True)
+        # The vocab is append-only, so writing it first means a crash can
+        # only leave unused ids, never a partition with ids it lacks
+        atomic_write(self.vocab_path, json.dumps(self.vocab, ensure_ascii=False))
+        path = self.partition_path(date_str)
+        # Hidden temp name so partitions() never globs a half-written file
+        tmp_path = os.path.join(self.directory, f'.items-{date_str}.tmp.npz')
+        np.savez_compressed(tmp_path, **columns)
+        os.replace(tmp_path, path)
+        return len(items)
+
+    def day(self, date_str):
+        """One run's raw partition columns, or None when that date has none"""
+        path = self.partition_path(date_str)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as part:
+            return {name: part[name] for name in part.files}
+
+    def partitions(self, since=None, until=None):
+        paths = sorted(glob.glob(os.path.join(self.directory, 'items-*.npz')))
+        for path in paths:
+            date_str = os.path.basename(path)[len('items-'):-len('.npz')]
+            if (since and date_str < since) or (until and date_str > until):
+                continue
+            yield path
+
+    def load(self, since=None, until=None):
+        """Concatenate partitions into flat columns, deduplicated by URL.
+
+        The same article shows up in consecutive runs while it is inside the
+        recency window, so only its first occurrence is kept.
+        """
+        parts = []
+        for path in self.partitions(since, until):
+            with np.load(path) as part:
+                parts.append({name: part[name] for name in part.files})
+        if not parts:
+            return None
+
+        flat = {name: np.concatenate([p[name] for p in parts]) for name in ITEM_COLUMNS}
+
+        _, first = np.unique(flat['url_hash'], return_index=True)
+        keep = np.zeros(len(flat['url_hash']), dtype=bool)
+        keep[first] = True
+
+        mentions = {}
+        for kind in MENTION_COLUMNS:
+            lengths, ids = [], []
+            for p in parts:
+                n_items = len(p['url_hash'])
+                if f'{kind}_offsets' in p:
+                    lengths.append(np.diff(p[f'{kind}_offsets']))
+                    ids.append(p[f'{kind}_ids'])
+                else:
+                    # Partitions written before this column existed
+                    lengths.append(np.zeros(n_items, dtype=np.int64))
+            lengths = np.concatenate(lengths)
+            ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int32)
+            # Expand the keep mask to the mention level before filtering ids
+            mentions[f'{kind}_ids'] = ids[np.repeat(keep, lengths)]
+            mentions[f'{kind}_offsets'] = np.concatenate([[0], np.cumsum(lengths[keep])])
+
+        flat = {name: column[keep] for name, column in flat.items()}
+        flat.update(mentions)
+        return flat
+
+    def entity_index(self, since=None, until=None):
+        """Inverted index: entity name -> (days, url hashes) of items mentioning it"""
+        columns = self.load(since, until)
+        if columns is None or not len(columns['entity_ids']):
+            return {}
+        lengths = np.diff(columns['entity_offsets'])
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        order = np.argsort(columns['entity_ids'], kind='stable')
+        ids = columns['entity_ids'][order]
+        rows = rows[order]
+        bounds = np.flatnonzero(np.diff(ids)) + 1
+        names = self.vocab['entities']
+        index = {}
+        for group_ids, group_rows in zip(np.split(ids, bounds), np.split(rows, bounds)):
+            index[names[group_ids[0]]] = (columns['day'][group_rows], columns['url_hash'][group_rows])
+        return index
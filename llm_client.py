@@ -0,0 +1,278 @@
+import os
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+API_URL = "https://api.perplexity.ai/chat/completions"
+DEFAULT_MODEL = "sonar-pro"
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+# Without an explicit deadline, a request gets this long to connect and
+# queue plus time to generate max_tokens at the slowest healthy rate
+BASE_DEADLINE = 60.0
+MIN_TOKENS_PER_SECOND = 20
+
+
+class LLMError(RuntimeError):
+    """A completion that failed permanently or ran out of time"""
+
+
+class RetryableError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenRateLimiter:
+    """Tokens-per-minute budget refilled continuously.
+
+    Requests reserve an estimate up front (prompt size plus max_tokens)
+    and hand back the difference once the response reports real usage.
+    """
+
+    def __init__(self, tokens_per_minute):
+        self.capacity = tokens_per_minute
+        self.tokens = float(tokens_per_minute)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def acquire(self, tokens, deadline=None):
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait_s = (tokens - self.tokens) * 60 / self.capacity
+            if deadline is not None and time.monotonic() + wait_s > deadline:
+                raise LLMError("Deadline exceeded waiting for token budget")
+            print(f"    ⏳ LLM token budget exhausted, waiting {wait_s:.1f}s")
+            time.sleep(wait_s)
+
+    def try_acquire(self, tokens):
+        """Reserve tokens only if the budget has them now"""
+        tokens = min(tokens, self.capacity)
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def settle(self, reserved, used):
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + reserved - used)
+
+
+class LatencyTracker:
+    """Rolling latency window for the hedging threshold"""
+
+    def __init__(self, size=50, min_samples=10):
+        self.samples = deque(maxlen=size)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def p95(self):
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+def estimate_tokens(messages, max_tokens):
+    """Rough reservation: ~4 characters per token plus the completion budget"""
+    return sum(len(m['content']) for m in messages) // 4 + max_tokens
+
+
+def default_deadline(max_tokens):
+    """Seconds a request may take when neither the caller nor NEWS_LLM_DEADLINE sets one"""
+    return BASE_DEADLINE + max_tokens / MIN_TOKENS_PER_SECOND
+
+
+def tokens_used(result, reserved):
+    return result.get('usage', {}).get('total_tokens', reserved)
+
+
+class LLMScheduler:
+    """Shared gateway for chat completions.
+
+    - at most max_concurrency requests in flight (hedges included)
+    - tokens_per_minute budget across every caller
+    - exponential backoff with full jitter on 429/5xx, honouring Retry-After
+    - optional hedging: once the p95 latency is known, a request still
+      pending after p95 gets a duplicate (with its own token reservation)
+      and the first answer wins
+    - a per-request deadline covering queueing, retries, backoff and the
+      response itself; by default it grows with max_tokens so long
+      completions are not cut off
+    """
+
+    def __init__(self, api_key=None, model=DEFAULT_MODEL, max_concurrency=4, tokens_per_minute=60000,
+                 max_retries=4, base_delay=1.0, max_delay=30.0, timeout=None, hedge=False):
+        self.api_key = api_key or os.environ.get("PERPLEXITY_API_KEY")
+        self.model = model
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.limiter = TokenRateLimiter(tokens_per_minute)
+        self.latency = LatencyTracker()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.hedge = hedge
+        # Separate pools: fan-out callers block on complete(), which may
+        # itself wait on hedged attempts
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.attempts = ThreadPoolExecutor(max_workers=max_concurrency * 2)
+
+    def _post(self, payload, deadline):
+        """One HTTP attempt; returns the parsed body or raises RetryableError/LLMError"""
+        import requests
+
+        with self.slots:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMError("Deadline exceeded before the request was sent")
+            start = time.monotonic()
+            try:
+                response = requests.post(
+                    API_URL,
+                    headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+                    json=payload,
+                    timeout=(10, remaining),
+                )
+            except (requests.Timeout, requests.ConnectionError) as e:
+                raise RetryableError(f"{type(e).__name__}: {e}")
+            self.latency.record(time.monotonic() - start)
+
+        if response.status_code in RETRY_STATUSES:
+            retry_after = response.headers.get('Retry-After')
+            raise RetryableError(
+                f"HTTP {response.status_code}",
+                float(retry_after) if retry_after and retry_after.replace('.', '', 1).isdigit() else None
+            )
+        if response.status_code >= 400:
+            raise LLMError(f"HTTP {response.status_code}: {response.text[:300]}")
+        return response.json()
+
+    def _hedge(self, payload, reserved, deadline):
+        """Duplicate request, or None when the token budget cannot cover it.
+
+        The duplicate's reservation is settled when it finishes, even if
+        the other request has already answered.
+        """
+        if not self.limiter.try_acquire(reserved):
+            return None
+
+        def settle(future):
+            try:
+                used = tokens_used(future.result(), reserved)
+            except Exception:
+                used = 0
+            self.limiter.settle(reserved, used)
+
+        future = self.attempts.submit(self._post, payload, deadline)
+        future.add_done_callback(settle)
+        return future
+
+    def _attempt(self, payload, reserved, deadline):
+        """One attempt, hedged with a duplicate request when enabled and slow.
+
+        Waits no longer than the deadline: the HTTP read timeout restarts
+        with every chunk received, so a slow response could outlive it.
+        A request abandoned here keeps its slot until its socket times out.
+        """
+        pending = {self.attempts.submit(self._post, payload, deadline)}
+        done = set()
+        threshold = self.latency.p95() if self.hedge else None
+        if threshold is not None:
+            done, pending = wait(pending, timeout=min(threshold, max(deadline - time.monotonic(), 0)))
+            if not done and time.monotonic() < deadline:
+                hedge = self._hedge(payload, reserved, deadline)
+                if hedge is not None:
+                    print(f"    🏇 Hedging LLM request after {threshold:.1f}s")
+                    pending.add(hedge)
+
+        error = None
+        while True:
+            for future in done:
+                try:
+                    return future.result()
+                except (RetryableError, LLMError) as e:
+                    error = e
+            if not pending:
+                raise error
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMError("Deadline exceeded waiting for the response")
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+
+    def complete(self, messages, max_tokens=8000, temperature=0.2, deadline=None):
+        """Message content of a chat completion, retried within the deadline (seconds)"""
+        if not self.api_key:
+            raise ValueError("PERPLEXITY_API_KEY not set")
+
+        deadline = time.monotonic() + (deadline or self.timeout or default_deadline(max_tokens))
+        payload = {"model": self.model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+        reserved = estimate_tokens(messages, max_tokens)
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(reserved, deadline)
+            used = 0
+            try:
+                result = self._attempt(payload, reserved, deadline)
+                used = tokens_used(result, reserved)
+                return result['choices'][0]['message']['content']
+            except RetryableError as e:
+                if attempt == self.max_retries:
+                    raise LLMError(f"Giving up after {attempt + 1} attempts: {e}")
+                delay = e.retry_after or random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                if time.monotonic() + delay > deadline:
+                    raise LLMError(f"Deadline exceeded after {attempt + 1} attempts: {e}")
+                print(f"    🔁 LLM request failed ({e}), retrying in {delay:.1f}s")
+            finally:
+                # Every exit returns the unused reservation, errors included
+                self.limiter.settle(reserved, used)
+            time.sleep(delay)
+
+    def submit(self, messages, **kwargs):
+        """Future for a completion, for fan-out callers"""
+        return self.pool.submit(self.complete, messages, **kwargs)
+
+    def map(self, message_lists, **kwargs):
+        """Completions for many prompts, concurrently, in input order"""
+        futures = [self.submit(messages, **kwargs) for messages in message_lists]
+        return [future.result() for future in futures]
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler so every caller shares one concurrency and token budget"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                max_concurrency=int(os.environ.get('NEWS_LLM_CONCURRENCY', 4)),
+                tokens_per_minute=int(os.environ.get('NEWS_LLM_TPM', 60000)),
+                hedge=bool(os.environ.get('NEWS_LLM_HEDGE')),
+                # Seconds per request, retries included; unset scales with max_tokens
+                timeout=float(os.environ.get('NEWS_LLM_DEADLINE') or 0) or None,
+            )
+        return _scheduler
@@ -0,0 +1,291 @@
+import os
+import glob
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from aiohttp import web
+
+from generate_news_json import fetch_user_config, aggregate_all_sources, generate_json_analysis
+
+OUTPUT_DIR = 'output'
+
+# On-demand results are reused for repeat POSTs of the same profile/date
+RESULT_TTL = 15 * 60
+MAX_RESULTS = 64
+
+
+def profile_key(user_config, date_str):
+    """Stable key for a profile/date pair, used for coalescing and caching"""
+    canonical = json.dumps(user_config, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(f"{date_str}|{canonical}".encode('utf-8')).hexdigest()[:16]
+
+
+def make_etag(body):
+    """Strong ETag from response bytes"""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def json_response(request, payload, body=None):
+    """JSON response with ETag; answers 304 when the client copy is current"""
+    if body is None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    etag = make_etag(body)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if request.headers.get('If-None-Match') == etag:
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=body, content_type='application/json', headers=headers)
+
+
+class DigestStore:
+    """Reads digest JSON files from output/, cached by file mtime"""
+
+    def __init__(self, output_dir=OUTPUT_DIR):
+        self.output_dir = output_dir
+        self._files = {}
+
+    def path_for(self, date_str):
+        if date_str == 'latest':
+            return os.path.join(self.output_dir, 'latest-data.json')
+        return os.path.join(self.output_dir, f'news-data-{date_str}.json')
+
+    def load_bytes(self, path):
+        """Return raw file bytes, re-reading only when the file changed"""
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        cached = self._files.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'rb') as f:
+            body = f.read()
+        self._files[path] = (mtime, body)
+        return body
+
+    def digest(self, date_str):
+        body = self.load_bytes(self.path_for(date_str))
+        if body is None and date_str != 'latest':
+            from digest_format import DigestError, archive_path, read_archive, dumps
+            try:
+                archived = read_archive(archive_path(date_str[:7], os.path.join(self.output_dir, 'bundles')))
+            except DigestError as e:
+                print(f"⚠️  {e}")
+                return None
+            body = dumps(archived[date_str]) if date_str in archived else None
+        return body
+
+    def all_digests(self):
+        """Yield (date, parsed digest) for every dated digest, newest first"""
+        paths = sorted(glob.glob(os.path.join(self.output_dir, 'news-data-*.json')), reverse=True)
+        for path in paths:
+            body = self.load_bytes(path)
+            if body is None:
+                continue
+            date_str = os.path.basename(path)[len('news-data-'):-len('.json')]
+            try:
+                yield date_str, json.loads(body)
+            except json.JSONDecodeError:
+                continue
+
+        # Older digests packed into monthly archives by the publish stage
+        from digest_format import DigestError, read_archive
+        archives = sorted(glob.glob(os.path.join(self.output_dir, 'bundles', 'digests-*')), reverse=True)
+        for path in archives:
+            try:
+                archived = read_archive(path)
+            except DigestError as e:
+                print(f"⚠️  {e}")
+                continue
+            for date_str, digest in sorted(archived.items(), reverse=True):
+                yield date_str, digest
+
+
+class DigestGenerator:
+    """Runs on-demand generations, sharing one in-flight run per profile/date.
+
+    Finished results are kept for RESULT_TTL seconds, at most MAX_RESULTS
+    of them, least recently used first out.
+    """
+
+    def __init__(self, ttl=RESULT_TTL, max_results=MAX_RESULTS):
+        self.ttl = ttl
+        self.max_results = max_results
+        self._inflight = {}
+        self._results = OrderedDict()
+
+    def cached(self, key):
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl:
+            del self._results[key]
+            return None
+        self._results.move_to_end(key)
+        return entry[1]
+
+    async def get(self, user_config, date_str):
+        key = profile_key(user_config, date_str)
+        body = self.cached(key)
+        if body is not None:
+            return key, body
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, user_config))
+            self._inflight[key] = task
+        return key, await asyncio.shield(task)
+
+    async def _run(self, key, user_config):
+        loop = asyncio.get_running_loop()
+        try:
+            analysis = await loop.run_in_executor(None, self._generate, user_config)
+            body = json.dumps(analysis, ensure_ascii=False).encode('utf-8')
+            self._results[key] = (time.monotonic(), body)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+            return body
+        finally:
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _generate(user_config):
+        all_items = aggregate_all_sources()
+        return generate_json_analysis(all_items, user_config)
+
+
+async def get_digest(request):
+    """GET /digest/{date} - serve a stored digest (YYYY-MM-DD or 'latest')"""
+    date_str = request.match_info['date']
+    body = request.app['store'].digest(date_str)
+    if body is None:
+        raise web.HTTPNotFound(text=f"No digest for {date_str}")
+    return json_response(request, None, body=body)
+
+
+async def get_page(request):
+    """GET /pages/{date} - HTML page rendered from the stored digest, or the
+    archived page for days that predate digest JSON (possibly bundled)"""
+    from publish import read_page
+    from render_news import build_html
+
+    date_str = request.match_info['date']
+    data = request.app['store'].digest(date_str)
+    if data is not None:
+        body = build_html(json.loads(data), None if date_str == 'latest' else date_str).encode('utf-8')
+    else:
+        name = 'latest.html' if date_str == 'latest' else f'news-summary-{date_str}.html'
+        body = read_page(name)
+        if body is None:
+            raise web.HTTPNotFound(text=f"No page for {date_str}")
+
+    etag = make_etag(body)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if request.headers.get('If-None-Match') == etag:
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=body, content_type='text/html', charset='utf-8', headers=headers)
+
+
+async def get_feed(request):
+    """GET /feeds/{name} - static story feeds written by the render stage.
+    FileResponse sends Last-Modified and answers If-Modified-Since with 304"""
+    from feeds import FEEDS_DIR
+
+    name = request.match_info['name']
+    path = os.path.join(FEEDS_DIR, name)
+    if os.path.basename(name) != name or not os.path.isfile(path):
+        raise web.HTTPNotFound(text=f"No feed {name}")
+    content_type = 'application/atom+xml' if name.endswith('.atom') else 'application/feed+json'
+    return web.FileResponse(path, headers={'Content-Type': content_type, 'Cache-Control': 'no-cache'})
+
+
+def find_stories(store, query, limit):
+    """Stories whose title or summary contains query, newest digests first"""
+    results = []
+    for date_str, digest in store.all_digests():
+        for story in digest.get('stories', []):
+            haystack = f"{story.get('title', '')} {story.get('summary', '')}".lower()
+            if not query or query in haystack:
+                results.append(dict(story, digest_date=date_str))
+                if len(results) >= limit:
+                    return results
+    return results
+
+
+async def search_stories(request):
+    """GET /stories?q= - search stories across all stored digests"""
+    query = request.query.get('q', '').strip().lower()
+    try:
+        limit = int(request.query.get('limit', 50))
+    except ValueError:
+        raise web.HTTPBadRequest(text="limit must be an integer")
+    if limit < 1:
+        raise web.HTTPBadRequest(text="limit must be positive")
+
+    # Digest reads and parsing block, so the scan runs off the event loop
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(None, find_stories, request.app['store'], query, limit)
+    return json_response(request, {'query': query, 'count': len(results), 'stories': results})
+
+
+def profile_errors(user_config):
+    """Problems with a posted profile; an empty list means it can be generated"""
+    from prompt_builder import PROFILE_FIELDS
+
+    if not isinstance(user_config, dict):
+        return ["profile must be a JSON object"]
+    errors = []
+    if user_config.get('role') is not None and not isinstance(user_config['role'], str):
+        errors.append("role must be a string")
+    for _, key in PROFILE_FIELDS:
+        values = user_config.get(key)
+        if values is not None and not (isinstance(values, list) and all(isinstance(v, str) for v in values)):
+            errors.append(f"{key} must be a list of strings")
+    return errors
+
+
+async def post_digest(request):
+    """POST /digest - generate a personalized digest for the posted profile"""
+    if request.can_read_body:
+        try:
+            user_config = await request.json()
+        except json.JSONDecodeError:
+            raise web.HTTPBadRequest(text="Body must be a JSON profile")
+        # Checked before generation, which fetches every source
+        errors = profile_errors(user_config)
+        if errors:
+            raise web.HTTPBadRequest(text='; '.join(errors))
+    else:
+        user_config = await asyncio.get_running_loop().run_in_executor(None, fetch_user_config)
+
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    try:
+        key, body = await request.app['generator'].get(user_config, date_str)
+    except Exception as e:
+        print(f"❌ On-demand generation failed: {e}")
+        raise web.HTTPBadGateway(text=str(e))
+
+    response = json_response(request, None, body=body)
+    response.headers['X-Digest-Key'] = key
+    return response
+
+
+def create_app():
+    """Build the aiohttp application"""
+    app = web.Application()
+    app['store'] = DigestStore()
+    app['generator'] = DigestGenerator()
+    app.router.add_get('/digest/{date}', get_digest)
+    app.router.add_get('/pages/{date}', get_page)
+    app.router.add_get('/feeds/{name}', get_feed)
+    app.router.add_get('/stories', search_stories)
+    app.router.add_post('/digest', post_digest)
+    return app
+
+
+if __name__ == "__main__":
+    port = int(os.environ.get('NEWS_SERVER_PORT', 8080))
+    print(f"🚀 Serving digests on http://localhost:{port}")
+    web.run_app(create_app(), port=port)
@@ -0,0 +1,118 @@
+import os
+import json
+import shutil
+
+CHECKPOINT_DIR = os.path.join('cache', 'checkpoints')
+
+
+def _temp_path(path):
+    """Temp file in the target's directory so os.replace stays on one filesystem"""
+    import tempfile
+
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    os.close(fd)
+    # mkstemp creates 0600 files; published artifacts should be world-readable
+    os.chmod(tmp_path, 0o644)
+    return tmp_path
+
+
+def _write_temp(path, data):
+    tmp_path = _temp_path(path)
+    try:
+        if isinstance(data, bytes):
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+def atomic_write(path, data):
+    """Replace path with data (str or bytes) so readers never see a partial file"""
+    os.replace(_write_temp(path, data), path)
+
+
+def atomic_write_json(path, payload, indent=2):
+    atomic_write(path, json.dumps(payload, indent=indent, ensure_ascii=False))
+
+
+class OutputTransaction:
+    """Stages several artifacts and publishes them together.
+
+    Every artifact is fully written and fsynced to a temp file before any
+    rename happens, so a crash while rendering leaves the previous outputs
+    untouched. Usable as a context manager; staged files are discarded if
+    the block raises.
+    """
+
+    def __init__(self):
+        self.staged = []
+
+    def write(self, path, data):
+        self.staged.append((_write_temp(path, data), path))
+
+    def write_json(self, path, payload, indent=2):
+        self.write(path, json.dumps(payload, indent=indent, ensure_ascii=False))
+
+    def commit(self):
+        for tmp_path, path in self.staged:
+            os.replace(tmp_path, path)
+        committed = [path for _, path in self.staged]
+        self.staged = []
+        return committed
+
+    def rollback(self):
+        for tmp_path, _ in self.staged:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        self.staged = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+
+class Checkpoints:
+    """Per-date stage outputs so an interrupted run resumes where it stopped"""
+
+    def __init__(self, run_date, checkpoint_dir=CHECKPOINT_DIR):
+        self.directory = os.path.join(checkpoint_dir, run_date)
+        self.enabled = not os.environ.get('NEWS_FRESH')
+
+    def path_for(self, stage):
+        return os.path.join(self.directory, f'{stage}.json')
+
+    def load(self, stage):
+        """Saved stage output, or None when missing or NEWS_FRESH is set"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self.path_for(stage), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        print(f"♻️  Resuming from checkpoint: {stage}")
+        return data
+
+    def save(self, stage, data):
+        atomic_write(self.path_for(stage), json.dumps(data, ensure_ascii=False))
+
+    def clear(self):
+        """Drop all checkpoints once the run's outputs are published"""
+        shutil.rmtree(self.directory, ignore_errors=True)
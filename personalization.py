@@ -0,0 +1,336 @@
+import os
+import json
+import time
+import hashlib
+
+from entities import tokenize
+from prompt_builder import (PROFILE_FIELDS, profile_block, prefix_hash, sorted_values, inline,
+                            item_analysis_prompt, relevance_prompt, digest_summary_prompt)
+
+CACHE_DIR = os.path.join('cache', 'personalization')
+# Bump when ITEM_INSTRUCTIONS or RELEVANCE_INSTRUCTIONS change meaning
+ANALYSIS_VERSION = 1
+BATCH_SIZE = 10
+STORY_COUNT = 15
+# nearest() compares against at most this many recently used profiles
+NEAREST_PROFILES = 20
+
+
+def parse_json(content):
+    """JSON from a model response, tolerating markdown fences"""
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0]
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0]
+    return json.loads(content.strip())
+
+
+def read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def split_by_age(directory, max_age):
+    """(fresh, stale) .json DirEntries in directory, newest first; stale ones
+    were not modified within max_age seconds"""
+    try:
+        entries = [e for e in os.scandir(directory) if e.name.endswith('.json') and e.is_file()]
+    except OSError:
+        return [], []
+    horizon = time.time() - max_age
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    fresh = [e for e in entries if e.stat().st_mtime >= horizon]
+    return fresh, entries[len(fresh):]
+
+
+def remove_all(entries):
+    for entry in entries:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+    return len(entries)
+
+
+def item_key(item):
+    """Changes when the item's text does, so edited articles are re-analyzed"""
+    text = f"{ANALYSIS_VERSION}\0{item.url}\0{item.title}\0{item.content or item.summary}"
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def profile_terms(user_config):
+    """Set of (field, value) pairs; the unit a profile edit is diffed in"""
+    terms = {('role', inline(user_config.get('role') or 'Developer').lower())}
+    for _, key in PROFILE_FIELDS:
+        terms.update((key, value.lower()) for value in sorted_values(user_config.get(key)))
+    return terms
+
+
+class ItemAnalysisCache:
+    """Profile-free item analysis (summary, category, key facts), one file per item.
+
+    Shared by every profile, so many users pay for each item once. A hit
+    touches the file, so its mtime is the last time the item was used.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = os.path.join(cache_dir, 'items')
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key[:2], f'{key}.json')
+
+    def get(self, key):
+        path = self.path_for(key)
+        analysis = read_json(path)
+        if analysis is not None:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return analysis
+
+    def put(self, key, analysis):
+        write_json(self.path_for(key), analysis)
+
+    def prune(self, max_age):
+        """Delete analyses unused for max_age seconds; returns the count"""
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        removed = 0
+        for shard in os.scandir(self.cache_dir):
+            if shard.is_dir():
+                removed += remove_all(split_by_age(shard.path, max_age)[1])
+        return removed
+
+
+class RelevanceCache:
+    """Per-profile relevance and why_relevant, one file per canonical profile"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = os.path.join(cache_dir, 'profiles')
+
+    def path_for(self, profile_hash):
+        return os.path.join(self.cache_dir, f'{profile_hash}.json')
+
+    def load(self, profile_hash):
+        return read_json(self.path_for(profile_hash)) or {'terms': [], 'scores': {}}
+
+    def save(self, profile_hash, terms, scores):
+        write_json(self.path_for(profile_hash), {'terms': sorted(map(list, terms)), 'scores': scores})
+
+    def prune(self, max_age):
+        """Delete profiles not saved for max_age seconds; their scores are for items that aged out"""
+        return remove_all(split_by_age(self.cache_dir, max_age)[1])
+
+    def nearest(self, terms, keys, exclude, limit=NEAREST_PROFILES):
+        """Cached profile closest to terms that has scores for any of keys.
+
+        Only the limit most recently saved profiles are read; older ones
+        score items that have mostly left the recency window.
+        """
+        best = None
+        fresh, _ = split_by_age(self.cache_dir, float('inf'))
+        for entry in [e for e in fresh if e.name[:-len('.json')] != exclude][:limit]:
+            cached = read_json(entry.path)
+            if not cached or not keys & cached['scores'].keys():
+                continue
+            delta = terms ^ {tuple(t) for t in cached['terms']}
+            if best is None or len(delta) < len(best[0]):
+                best = (delta, cached)
+        return best
+
+
+def affected(delta, text_tokens):
+    """Whether a profile edit can change an item's relevance.
+
+    A role change affects everything; otherwise an item is affected when
+    it mentions an added or removed value (every token of it), or when its
+    previous explanation did.
+    """
+    for field, value in delta:
+        if field == 'role':
+            return True
+        tokens = tokenize(value)
+        if tokens and text_tokens.issuperset(tokens):
+            return True
+    return False
+
+
+def run_batches(scheduler, prompts, max_tokens):
+    """Completions for each prompt, parsed; a failed batch yields None"""
+    futures = [scheduler.submit(messages, max_tokens=max_tokens, temperature=0.2) for messages in prompts]
+    results = []
+    for future in futures:
+        try:
+            results.append(parse_json(future.result()))
+        except Exception as e:
+            print(f"    ⚠️  Batch failed: {e}")
+            results.append(None)
+    return results
+
+
+def by_index(rows, count):
+    """Model rows keyed by their 1-based index, positional as a fallback"""
+    keyed = {}
+    for position, row in enumerate(rows if isinstance(rows, list) else []):
+        if not isinstance(row, dict):
+            continue
+        index = row.get('index')
+        index = index - 1 if isinstance(index, int) and 1 <= index <= count else position
+        keyed.setdefault(index, row)
+    return keyed
+
+
+def analyze_items(items, scheduler, cache):
+    """{item_key: analysis} for every item, computing only uncached ones"""
+    keys = [item_key(item) for item in items]
+    analyses = {}
+    missing = []
+    for item, key in zip(items, keys):
+        cached = cache.get(key)
+        if cached is not None:
+            analyses[key] = cached
+        else:
+            missing.append((item, key))
+
+    batches = [missing[i:i + BATCH_SIZE] for i in range(0, len(missing), BATCH_SIZE)]
+    prompts = [item_analysis_prompt([item for item, _ in batch]) for batch in batches]
+    for batch, rows in zip(batches, run_batches(scheduler, prompts, max_tokens=300 * BATCH_SIZE)):
+        keyed = by_index(rows, len(batch))
+        for position, (item, key) in enumerate(batch):
+            row = keyed.get(position)
+            if row is None:
+                continue
+            analysis = {
+                'summary': str(row.get('summary') or ''),
+                'category': str(row.get('category') or item.semantic_category or 'General Tech'),
+                'key_facts': [str(fact) for fact in row.get('key_facts') or []],
+            }
+            cache.put(key, analysis)
+            analyses[key] = analysis
+
+    print(f"🧠 Item analysis: {len(items) - len(missing)} cached, {len(missing)} computed")
+    return analyses
+
+
+def score_items(items, analyses, user_config, scheduler, cache):
+    """{item_key: {relevance_score, why_relevant}} for this profile.
+
+    Scores are reused from this profile's cache first, then from the
+    nearest cached profile for items the edit cannot affect; only the
+    rest go to the model.
+    """
+    terms = profile_terms(user_config)
+    profile_hash = prefix_hash(profile_block(user_config))
+    own = cache.load(profile_hash)['scores']
+    keys = [item_key(item) for item in items if item_key(item) in analyses]
+    missing = {key for key in keys if key not in own}
+
+    reused = 0
+    nearest = cache.nearest(terms, missing, profile_hash) if missing else None
+    if nearest is not None:
+        delta, base = nearest
+        for item in items:
+            key = item_key(item)
+            if key not in missing or key not in base['scores']:
+                continue
+            previous = base['scores'][key]
+            analysis = analyses[key]
+            text = ' '.join([item.title, analysis['summary'], *analysis['key_facts'], previous['why_relevant']])
+            if not affected(delta, set(tokenize(text))):
+                own[key] = previous
+                missing.discard(key)
+                reused += 1
+
+    pending = [item for item in items if item_key(item) in missing]
+    batches = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+    prompts = [relevance_prompt(user_config, [(item.title, analyses[item_key(item)]) for item in batch])
+               for batch in batches]
+    for batch, rows in zip(batches, run_batches(scheduler, prompts, max_tokens=150 * BATCH_SIZE)):
+        keyed = by_index(rows, len(batch))
+        for position, item in enumerate(batch):
+            row = keyed.get(position)
+            if row is None:
+                continue
+            try:
+                score = float(str(row.get('relevance_score', 0)).split('/')[0])
+            except ValueError:
+                score = 0
+            own[item_key(item)] = {
+                'relevance_score': int(score) if score.is_integer() else score,
+                'why_relevant': str(row.get('why_relevant') or ''),
+            }
+
+    # Items age out of the recency window, so only this run's scores are kept
+    own = {key: own[key] for key in keys if key in own}
+    cache.save(profile_hash, terms, own)
+    print(f"🎯 Relevance: {len(keys) - len(missing) - reused} cached, {reused} reused from a similar profile, "
+          f"{len(pending)} scored")
+    return own
+
+
+def layered_analysis(items, user_config, date_str, computed_signals=None, scheduler=None, cache_dir=CACHE_DIR):
+    """Digest built from cached layers instead of one monolithic call.
+
+    1. per-item analysis, shared across profiles
+    2. per-profile relevance, recomputed only for items a profile edit affects
+    3. digest summary and actions over the selected stories (one short call)
+    """
+    from digest_format import normalize
+
+    if scheduler is None:
+        from llm_client import get_scheduler
+        scheduler = get_scheduler()
+
+    from recency import get_policy
+
+    item_cache, relevance_cache = ItemAnalysisCache(cache_dir), RelevanceCache(cache_dir)
+    analyses = analyze_items(items, scheduler, item_cache)
+    scores = score_items(items, analyses, user_config, scheduler, relevance_cache)
+
+    # Entries unused for longer than any recency window can never be hit again
+    max_age = get_policy().max_window
+    removed = item_cache.prune(max_age) + relevance_cache.prune(max_age)
+    if removed:
+        print(f"🧹 Pruned {removed} stale personalization cache files")
+
+    candidates = []
+    for rank, item in enumerate(items):
+        key = item_key(item)
+        if key not in analyses or key not in scores:
+            continue
+        analysis, score = analyses[key], scores[key]
+        candidates.append((rank, {
+            'title': item.title,
+            'url': item.url,
+            'summary': analysis['summary'],
+            'relevance_score': score['relevance_score'],
+            'why_relevant': score['why_relevant'],
+            'category': analysis['category'],
+            'source': item.source,
+            'date': item.date,
+            'key_facts': analysis['key_facts'],
+        }))
+    # Highest relevance first; the upstream ranking breaks ties
+    candidates.sort(key=lambda pair: (-pair[1]['relevance_score'], pair[0]))
+    stories = [story for _, story in candidates[:STORY_COUNT]]
+
+    digest = parse_json(scheduler.complete(
+        digest_summary_prompt(user_config, stories, date_str, computed_signals), max_tokens=3000, temperature=0.2
+    ))
+    return normalize({
+        'smart_digest': digest.get('smart_digest') or {},
+        'stories': stories,
+        'actions': digest.get('actions') or [],
+    })
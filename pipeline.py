@@ -0,0 +1,316 @@
+import os
+import sys
+import time
+import argparse
+import threading
+from datetime import datetime
+
+from output_writer import Checkpoints
+from news_item import NewsItem, normalize_items, dedupe_items, to_epoch
+
+
+class Stage:
+    """One pipeline step: a function of its dependencies' outputs.
+
+    dump/restore convert the output to and from JSON so it can be
+    checkpointed and picked up by a later --from run.
+    """
+
+    def __init__(self, name, deps, func, dump=None, restore=None):
+        self.name = name
+        self.deps = deps
+        self.func = func
+        self.dump = dump or (lambda value: value)
+        self.restore = restore or (lambda value: value)
+
+
+def dump_items(items):
+    return [item.to_dict() for item in items]
+
+
+def restore_items(data):
+    return [NewsItem.from_dict(d) for d in data]
+
+
+def dump_raw(results):
+    # feedparser time tuples are not JSON; store them as the epoch they normalize to
+    return {
+        kind: [dict(raw, published=to_epoch(raw.get('published'))) for raw in items]
+        for kind, items in results.items()
+    }
+
+
+def run_profile(ctx, inputs):
+    from generate_news_json import fetch_user_config
+    return fetch_user_config()
+
+
+def run_fetch(ctx, inputs):
+    from sources import load_sources, fetch_all
+    print("Fetching from multiple sources...")
+    adapters, max_workers = load_sources()
+    return fetch_all(adapters, max_workers)
+
+
+def run_normalize(ctx, inputs):
+    raw = [item for items in inputs['fetch'].values() for item in items]
+    return normalize_items(raw)
+
+
+def run_dedupe(ctx, inputs):
+    items = dedupe_items(inputs['normalize'])
+    print(f"✅ {len(items)} unique items ({len(inputs['normalize']) - len(items)} duplicates dropped)")
+    return items
+
+
+def stage_matcher(ctx, inputs):
+    """The run's entity matcher: dictionary entities plus the profile's
+    tracked companies and today's repos, built once and shared by every
+    stage so they all resolve the same names"""
+    from entities import build_matcher
+    with ctx['lock']:
+        if 'matcher' not in ctx:
+            ctx['matcher'] = build_matcher(inputs['entities'], inputs['profile'])
+        return ctx['matcher']
+
+
+def run_entities(ctx, inputs):
+    from entities import annotate_items
+
+    items = inputs['dedupe']
+    index = annotate_items(items, stage_matcher(ctx, {'entities': items, 'profile': inputs['profile']}))
+    print(f"🏷️  {len(index)} entities mentioned across {sum(1 for item in items if item.entities)} items")
+    return items
+
+
+def run_history(ctx, inputs):
+    from categorizer import get_categorizer
+    from history_store import HistoryStore
+
+    items = inputs['entities']
+    categorizer = get_categorizer()
+    count = HistoryStore().write_day(ctx['date'], items, [categorizer.classify(item) for item in items])
+    return {'items': count}
+
+
+def run_trends(ctx, inputs):
+    from entities import resolve_tracked
+    from trends import compute_trends
+
+    tracked = resolve_tracked(stage_matcher(ctx, inputs), inputs['profile'])
+    trends = compute_trends(ctx['date'], tracked=tracked)
+    if trends:
+        print(f"📈 {len(trends['rising_terms'])} rising terms over {trends['days']} days of history")
+    return trends or {}
+
+
+def run_rank(ctx, inputs):
+    from recency import filter_recent
+    from generate_news_json import env_int, rank_items
+
+    from entities import resolve_tracked, boost_tracked
+
+    items = rank_items(filter_recent(inputs['entities']), inputs['profile'])
+    items = boost_tracked(items, resolve_tracked(stage_matcher(ctx, inputs), inputs['profile']))
+
+    top_k = env_int('NEWS_FETCH_ARTICLES')
+    if top_k:
+        from article_fetcher import enrich_items
+        enrich_items(items, top_k=top_k)
+    return items
+
+
+def run_analyze(ctx, inputs):
+    from generate_news_json import generate_json_analysis
+    print("\nGenerating personalized analysis with Perplexity...")
+    from entities import resolve_tracked, tracked_hits
+    from trends import format_signals
+
+    items = inputs['rank']
+    index = {}
+    for position, item in enumerate(items):
+        for name in item.entities or []:
+            index.setdefault(name, []).append(position)
+    signals = format_signals(inputs['trends'])
+    tracked = resolve_tracked(stage_matcher(ctx, inputs), inputs['profile'])
+    for name, count in tracked_hits(index, tracked).items():
+        signals.append(f"Tracked company {name} is mentioned in {count} of today's items")
+    return generate_json_analysis(items, inputs['profile'], signals)
+
+
+def run_graph(ctx, inputs):
+    from story_graph import build_graph
+
+    analysis = inputs['analyze']
+    matcher = stage_matcher(ctx, inputs)
+    for story in analysis.get('stories', []):
+        story['entities'] = matcher.match(f"{story.get('title', '')} {story.get('summary', '')}")
+    return build_graph(analysis, ctx['date'])
+
+
+def run_render(ctx, inputs):
+    from digest_format import dumps
+    from feeds import feed_artifacts, prune_feeds
+    from publish import publish
+    from render_news import build_html
+
+    analysis = inputs['graph']
+    html = build_html(analysis, ctx['date'])
+    data_file = f"output/news-data-{ctx['date']}.json"
+    html_file = f"output/news-summary-{ctx['date']}.html"
+
+    data = dumps(analysis)
+    artifacts = {
+        data_file: data,
+        "output/latest-data.json": data,
+        html_file: html,
+        "output/latest.html": html,
+    }
+    artifacts.update(feed_artifacts(analysis, ctx['date']))
+    written = publish(artifacts)
+    prune_feeds(ctx['date'])
+
+    print(f"✅ Rendered {html_file} ({len(written)} changed artifacts written)")
+    return {'file': html_file, 'data_file': data_file}
+
+
+def run_archive(ctx, inputs):
+    from digest_format import load_digest
+    from transform_news import update_archive_json
+    from update_index import digest_metadata
+
+    display_date = datetime.strptime(ctx['date'], "%Y-%m-%d").strftime("%A, %B %d, %Y")
+    metadata = digest_metadata(load_digest(inputs['render']['data_file']))
+    update_archive_json(display_date, inputs['render']['file'], metadata)
+    return {'date': ctx['date']}
+
+
+def run_index(ctx, inputs):
+    from update_index import update_landing_page
+    update_landing_page(ctx['date'])
+    return {'date': ctx['date']}
+
+
+def run_publish(ctx, inputs):
+    from publish import Manifest, SITE_DIR, build_site, content_hash, pack_old_pages
+
+    manifest = Manifest()
+    for path in ['index.html', 'archive.json']:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                manifest.record(path, content_hash(f.read()))
+    packed = pack_old_pages(ctx['date'], manifest=manifest)
+    pages = build_site(SITE_DIR)
+    return {'date': ctx['date'], 'packed': packed, 'pages': pages}
+
+
+STAGES = [
+    Stage('profile', [], run_profile),
+    Stage('fetch', [], run_fetch, dump=dump_raw),
+    Stage('normalize', ['fetch'], run_normalize, dump_items, restore_items),
+    Stage('dedupe', ['normalize'], run_dedupe, dump_items, restore_items),
+    Stage('entities', ['dedupe', 'profile'], run_entities, dump_items, restore_items),
+    Stage('history', ['entities'], run_history),
+    Stage('trends', ['history', 'entities', 'profile'], run_trends),
+    Stage('rank', ['entities', 'profile'], run_rank, dump_items, restore_items),
+    Stage('analyze', ['rank', 'entities', 'profile', 'trends'], run_analyze),
+    Stage('graph', ['analyze', 'entities', 'profile'], run_graph),
+    Stage('render', ['graph'], run_render),
+    Stage('archive', ['render'], run_archive),
+    Stage('index', ['archive'], run_index),
+    Stage('publish', ['index'], run_publish),
+]
+
+STAGE_MAP = {stage.name: stage for stage in STAGES}
+STAGE_NAMES = [stage.name for stage in STAGES]
+
+
+def select_stages(start=None, until=None):
+    """Stage names from --from through --until, in topological order"""
+    first = STAGE_NAMES.index(start) if start else 0
+    last = STAGE_NAMES.index(until) if until else len(STAGE_NAMES) - 1
+    if first > last:
+        raise ValueError(f"--from {start} comes after --until {until}")
+    return STAGE_NAMES[first:last + 1]
+
+
+def run_pipeline(selected, run_date, max_workers=4):
+    """Run selected stages, concurrently wherever dependencies allow.
+
+    Outputs are passed in memory; dependencies outside the selection are
+    restored from this date's checkpoints.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    ctx = {'date': run_date, 'lock': threading.Lock()}
+    checkpoints = Checkpoints(run_date)
+    results = {}
+
+    pending = list(selected)
+    for name in selected:
+        for dep in STAGE_MAP[name].deps:
+            if dep in pending or dep in results:
+                continue
+            saved = checkpoints.load(dep)
+            if saved is not None:
+                results[dep] = STAGE_MAP[dep].restore(saved)
+            elif not STAGE_MAP[dep].deps:
+                # Cheap root stages (e.g. profile) just run again
+                pending.insert(0, dep)
+            else:
+                raise RuntimeError(f"Stage '{name}' needs '{dep}', which has no checkpoint for {run_date}")
+
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for name in list(pending):
+                if all(dep in results for dep in STAGE_MAP[name].deps):
+                    pending.remove(name)
+                    inputs = {dep: results[dep] for dep in STAGE_MAP[name].deps}
+                    print(f"▶️  {name}")
+                    running[pool.submit(timed, STAGE_MAP[name], ctx, inputs)] = name
+
+            if not running:
+                raise RuntimeError(f"Unresolvable stages: {', '.join(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+                checkpoints.save(name, STAGE_MAP[name].dump(results[name]))
+
+    if selected[-1] == STAGE_NAMES[-1]:
+        # Full publish finished; the next run starts fresh
+        checkpoints.clear()
+    return results
+
+
+def timed(stage, ctx, inputs):
+    start = time.time()
+    result = stage.func(ctx, inputs)
+    print(f"⏱️  {stage.name} finished in {time.time() - start:.1f}s")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the news pipeline as one stage graph")
+    parser.add_argument('--from', dest='start', choices=STAGE_NAMES, help="first stage to run")
+    parser.add_argument('--until', choices=STAGE_NAMES, help="last stage to run")
+    parser.add_argument('--date', default=datetime.now().strftime("%Y-%m-%d"), help="run date (YYYY-MM-DD)")
+    parser.add_argument('--list', action='store_true', help="print stages and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for stage in STAGES:
+            print(f"{stage.name:<10} <- {', '.join(stage.deps) or '-'}")
+        return 0
+
+    selected = select_stages(args.start, args.until)
+    print(f"Running stages: {' → '.join(selected)}")
+    run_pipeline(selected, args.date)
+    print("🎉 Done!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
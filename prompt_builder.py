@@ -0,0 +1,269 @@
+import re
+import hashlib
+import unicodedata
+
+# Prompt layout, most stable first, so provider-side prefix caches can hit:
+#   1. system message + instructions/schema   identical for every call
+#   2. user profile                           identical per profile
+#   3. date, computed signals and news items  changes every run
+
+SYSTEM_PROMPT = "You are an expert news analyst. You ONLY respond with valid JSON. Never use markdown or code blocks. Your entire response must be parseable JSON."
+
+INSTRUCTIONS = """You will receive a USER PROFILE followed by today's news items. Analyze the news items and create a personalized digest for that user.
+
+CRITICAL: Your response MUST be ONLY valid JSON. Do not include any markdown, explanations, or text outside the JSON structure.
+
+Return this EXACT JSON structure:
+
+{
+  "smart_digest": {
+    "tldr": "One powerful sentence capturing today's theme",
+    "patterns": [
+      "Pattern 1: Description of a pattern across stories",
+      "Pattern 2: Another connection between stories",
+      "Pattern 3: Third pattern or trend"
+    ],
+    "signals": [
+      "Signal 1: What's trending up",
+      "Signal 2: What's noteworthy"
+    ],
+    "bottom_line": "2-3 sentences about what this means for someone in the user's role"
+  },
+  "stories": [
+    {
+      "title": "Story title from the news items",
+      "url": "Exact URL from the news items",
+      "summary": "Brief 1-2 sentence summary",
+      "relevance_score": 9,
+      "why_relevant": "Specific explanation of why this matters to the user based on their profile. Mention their specific projects, learning topics, or interests.",
+      "category": "AI Companies|Developer Tools|GitHub Trending|Product Launches|Research|General Tech",
+      "source": "Source name from the news items",
+      "date": "YYYY-MM-DD"
+    }
+  ],
+  "actions": [
+    {
+      "type": "OPPORTUNITY|LEARN|BUILD|NETWORK|WATCH",
+      "priority": "HIGH|MEDIUM|LOW",
+      "title": "Specific actionable title",
+      "description": "Clear description of what to do (2-3 sentences)",
+      "why_now": "Why this is timely or urgent",
+      "time_estimate": "X hours|X minutes",
+      "related_stories": [0, 2, 5]
+    }
+  ]
+}
+
+REQUIREMENTS:
+1. Select the 12-15 MOST RELEVANT stories based on the user's profile
+2. Score each story 1-10 for relevance (be honest - not everything is a 10)
+3. "why_relevant" must be SPECIFIC to the user's projects/learning/interests
+4. Generate 3-5 actionable items that are SPECIFIC and TIMELY
+5. Response must be ONLY valid JSON - no markdown, no explanation, no ```json blocks
+6. Use exact URLs and titles from the news items
+7. Make patterns and signals based on ACTUAL data, not generic observations; ground "signals" in the COMPUTED SIGNALS when they are provided
+8. "related_stories" are 0-based positions in your "stories" array"""
+
+# Layered personalization (personalization.py): a profile-free per-item
+# analysis, per-profile relevance over those analyses, then the digest
+# summary over the selected stories only
+
+ITEM_INSTRUCTIONS = """Analyze each news item independently of any reader.
+
+CRITICAL: Your response MUST be ONLY a valid JSON array, one object per item, in input order:
+
+[
+  {
+    "index": 1,
+    "summary": "Brief 1-2 sentence factual summary",
+    "category": "AI Companies|Developer Tools|GitHub Trending|Product Launches|Research|General Tech",
+    "key_facts": ["Concrete fact: names, numbers, versions, dates", "Another fact"]
+  }
+]
+
+Use 2-4 key facts per item, taken only from the item text."""
+
+RELEVANCE_INSTRUCTIONS = """You will receive a USER PROFILE followed by analyzed news items. Score how relevant each item is to that user.
+
+CRITICAL: Your response MUST be ONLY a valid JSON array, one object per item, in input order:
+
+[
+  {
+    "index": 1,
+    "relevance_score": 7,
+    "why_relevant": "Specific explanation of why this matters to the user. Mention their specific projects, learning topics, or interests."
+  }
+]
+
+Score 1-10 and be honest - not everything is a 10. "why_relevant" must be SPECIFIC to the user's profile."""
+
+DIGEST_INSTRUCTIONS = """You will receive a USER PROFILE followed by today's selected stories, already summarized and scored for that user. Write the digest summary and actions.
+
+CRITICAL: Your response MUST be ONLY valid JSON:
+
+{
+  "smart_digest": {
+    "tldr": "One powerful sentence capturing today's theme",
+    "patterns": ["Pattern 1: Description of a pattern across stories", "Pattern 2", "Pattern 3"],
+    "signals": ["Signal 1: What's trending up", "Signal 2: What's noteworthy"],
+    "bottom_line": "2-3 sentences about what this means for someone in the user's role"
+  },
+  "actions": [
+    {
+      "type": "OPPORTUNITY|LEARN|BUILD|NETWORK|WATCH",
+      "priority": "HIGH|MEDIUM|LOW",
+      "title": "Specific actionable title",
+      "description": "Clear description of what to do (2-3 sentences)",
+      "why_now": "Why this is timely or urgent",
+      "time_estimate": "X hours|X minutes",
+      "related_stories": [0, 2, 5]
+    }
+  ]
+}
+
+Generate 3-5 SPECIFIC and TIMELY actions. "related_stories" are the 0-based positions in the STORIES list. Ground "signals" in the COMPUTED SIGNALS when they are provided."""
+
+PROFILE_FIELDS = [
+    ('Projects', 'projects'),
+    ('Learning', 'learning'),
+    ('Tracking Companies', 'tracking_companies'),
+    ('Interests', 'interests'),
+]
+
+SPACE_RE = re.compile(r'[ \t\r\f\v]+')
+BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+
+def normalize_text(text):
+    """NFC, collapsed runs of spaces, no trailing spaces, at most one blank line"""
+    text = unicodedata.normalize('NFC', str(text))
+    lines = [SPACE_RE.sub(' ', line).strip() for line in text.split('\n')]
+    return BLANK_LINES_RE.sub('\n\n', '\n'.join(lines)).strip()
+
+
+def inline(text):
+    """Single-line form of free text for list entries"""
+    return ' '.join(normalize_text(text).split())
+
+
+def sorted_values(values):
+    """Deduplicated, case-insensitively sorted list entries"""
+    unique = {inline(v).lower(): inline(v) for v in values or [] if inline(v)}
+    return [unique[key] for key in sorted(unique)]
+
+
+def profile_block(user_config):
+    """Canonical profile text: fixed field order, sorted values.
+
+    Two profiles with the same content always serialize identically,
+    however the lists were ordered or spaced when they were saved.
+    """
+    lines = ["USER PROFILE:", f"- Role: {inline(user_config.get('role') or 'Developer')}"]
+    for label, key in PROFILE_FIELDS:
+        lines.append(f"- {label}: {', '.join(sorted_values(user_config.get(key))) or 'None specified'}")
+    return '\n'.join(lines)
+
+
+def item_block(idx, item):
+    lines = [f"{idx}. {inline(item.title)}", f"   Source: {inline(item.source)}"]
+    if item.semantic_category:
+        lines.append(f"   Category hint: {item.semantic_category}")
+    lines.append(f"   Link: {item.url}")
+    if item.entities:
+        lines.append(f"   Mentions: {', '.join(item.entities)}")
+    if item.stars is not None:
+        lines.append(f"   Stars: {item.stars} ({item.star_velocity or 0:+g}/day)")
+    if item.content:
+        lines.append(f"   Article: {inline(item.content[:1500])}")
+    else:
+        lines.append(f"   Summary: {inline(item.summary[:200])}...")
+    return '\n'.join(lines)
+
+
+def items_block(items, date_str, computed_signals=None):
+    parts = [f"TODAY: {date_str}"]
+    if computed_signals:
+        parts.append("COMPUTED SIGNALS (measured over recent days of collected items):\n"
+                     + '\n'.join(f"- {inline(line)}" for line in computed_signals))
+    parts.append("NEWS ITEMS:\n\n" + '\n\n'.join(item_block(i + 1, item) for i, item in enumerate(items)))
+    return '\n\n'.join(parts)
+
+
+def analysis_block(idx, title, analysis):
+    lines = [f"{idx}. {inline(title)}", f"   Summary: {inline(analysis.get('summary', ''))}"]
+    if analysis.get('key_facts'):
+        lines.append(f"   Facts: {'; '.join(inline(fact) for fact in analysis['key_facts'])}")
+    return '\n'.join(lines)
+
+
+def json_messages(instructions, body):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"{instructions}\n\n{body}\n\nBegin JSON output now:"},
+    ]
+
+
+def item_analysis_prompt(items):
+    """Profile-free analysis of a batch of items; shareable across users"""
+    body = "NEWS ITEMS:\n\n" + '\n\n'.join(item_block(i + 1, item) for i, item in enumerate(items))
+    return json_messages(ITEM_INSTRUCTIONS, body)
+
+
+def relevance_prompt(user_config, entries):
+    """Relevance for (title, analysis) pairs under one profile"""
+    body = (profile_block(user_config) + "\n\nNEWS ITEMS:\n\n"
+            + '\n\n'.join(analysis_block(i + 1, title, analysis) for i, (title, analysis) in enumerate(entries)))
+    return json_messages(RELEVANCE_INSTRUCTIONS, body)
+
+
+def digest_summary_prompt(user_config, stories, date_str, computed_signals=None):
+    """Digest summary and actions over already selected, scored stories"""
+    parts = [profile_block(user_config), f"TODAY: {date_str}"]
+    if computed_signals:
+        parts.append("COMPUTED SIGNALS (measured over recent days of collected items):\n"
+                     + '\n'.join(f"- {inline(line)}" for line in computed_signals))
+    parts.append("STORIES:\n\n" + '\n\n'.join(
+        f"{i}. {inline(story['title'])} [{story['category']}, relevance {story['relevance_score']}]\n"
+        f"   Summary: {inline(story['summary'])}\n   Why relevant: {inline(story['why_relevant'])}"
+        for i, story in enumerate(stories)))
+    return json_messages(DIGEST_INSTRUCTIONS, '\n\n'.join(parts))
+
+
+def prefix_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]
+
+
+def build_prompt(items, user_config, date_str, computed_signals=None):
+    """Chat messages for the digest call plus prefix statistics.
+
+    Returns (messages, stats). stats['static_prefix'] counts the characters
+    shared by every call (system message plus instructions), and
+    stats['profile_prefix'] the characters shared by calls for the same
+    profile. Their hashes identify the cacheable prefixes in logs.
+    """
+    static = INSTRUCTIONS
+    profile = profile_block(user_config)
+    user_content = f"{static}\n\n{profile}\n\n{items_block(items, date_str, computed_signals)}\n\nBegin JSON output now:"
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_content},
+    ]
+
+    static_prefix = len(SYSTEM_PROMPT) + len(static)
+    profile_prefix = static_prefix + 2 + len(profile)
+    total = len(SYSTEM_PROMPT) + len(user_content)
+    stats = {
+        'static_prefix': static_prefix,
+        'profile_prefix': profile_prefix,
+        'total': total,
+        'static_hash': prefix_hash(SYSTEM_PROMPT + static),
+        'profile_hash': prefix_hash(SYSTEM_PROMPT + static + '\n\n' + profile),
+    }
+    return messages, stats
+
+
+def describe(stats):
+    return (f"🧩 Prompt {stats['total']} chars: stable prefix {stats['static_prefix']} "
+            f"({stats['static_prefix'] * 100 // max(stats['total'], 1)}%, {stats['static_hash']}), "
+            f"with profile {stats['profile_prefix']} "
+            f"({stats['profile_prefix'] * 100 // max(stats['total'], 1)}%, {stats['profile_hash']})")
@@ -0,0 +1,268 @@
+import io
+import os
+import sys
+import re
+import json
+import glob
+import shutil
+import hashlib
+import tarfile
+from datetime import datetime, timedelta
+
+from output_writer import OutputTransaction, atomic_write, atomic_write_json
+
+MANIFEST_FILE = 'publish-manifest.json'
+OUTPUT_DIR = 'output'
+BUNDLE_DIR = os.path.join(OUTPUT_DIR, 'bundles')
+
+# Dated pages stay loose for this long so recent links keep working
+KEEP_LOOSE_DAYS = 31
+
+# Static site uploaded to GitHub Pages; rendered pages are never committed
+SITE_DIR = '_site'
+SITE_FILES = ['index.html', 'settings.html', 'feed.json', 'rss.xml']
+SITE_DIRS = ['archive', os.path.join(OUTPUT_DIR, 'feeds')]
+
+PAGE_RE = re.compile(r'^news-summary-(\d{4}-\d{2})-\d{2}\.html$')
+
+
+def content_hash(data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+class Manifest:
+    """Content hashes of every published artifact, keyed by repo-relative path"""
+
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.hashes = json.load(f).get('files', {})
+        except (OSError, json.JSONDecodeError):
+            self.hashes = {}
+
+    def unchanged(self, path, digest):
+        return self.hashes.get(path) == digest and os.path.exists(path)
+
+    def record(self, path, digest):
+        self.hashes[path] = digest
+
+    def forget(self, path):
+        self.hashes.pop(path, None)
+
+    def save(self):
+        atomic_write_json(self.path, {'files': dict(sorted(self.hashes.items()))}, indent=1)
+
+
+def publish(artifacts, manifest=None):
+    """Write only the artifacts whose content changed, all in one transaction.
+
+    artifacts maps path -> str/bytes. Returns the paths actually written;
+    unchanged files keep their mtime and never show up in the git diff.
+    """
+    manifest = manifest or Manifest()
+    written = []
+    with OutputTransaction() as out:
+        for path, data in artifacts.items():
+            digest = content_hash(data)
+            if manifest.unchanged(path, digest):
+                continue
+            out.write(path, data)
+            manifest.record(path, digest)
+            written.append(path)
+    manifest.save()
+    return written
+
+
+def bundle_path(month):
+    return os.path.join(BUNDLE_DIR, f'news-summary-{month}.tar.xz')
+
+
+def read_bundle(path):
+    """Bundle members as {filename: bytes}"""
+    if not os.path.exists(path):
+        return {}
+    with tarfile.open(path, 'r:xz') as tar:
+        return {m.name: tar.extractfile(m).read() for m in tar.getmembers() if m.isfile()}
+
+
+def build_bundle(pages):
+    """Deterministic tar.xz: sorted members with fixed metadata, so the same
+    pages always produce the same bytes and re-packing is not a git change.
+    Solid xz compression shares the template across near-identical pages.
+    """
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:xz', preset=9) as tar:
+        for name in sorted(pages):
+            info = tarfile.TarInfo(name)
+            info.size = len(pages[name])
+            info.mtime = 0
+            info.mode = 0o644
+            tar.addfile(info, io.BytesIO(pages[name]))
+    return buffer.getvalue()
+
+
+def read_page(filename, output_dir=OUTPUT_DIR):
+    """Page bytes from output/ or, once packed, from its monthly bundle"""
+    loose = os.path.join(output_dir, filename)
+    if os.path.exists(loose):
+        with open(loose, 'rb') as f:
+            return f.read()
+    match = PAGE_RE.match(filename)
+    if not match:
+        return None
+    return read_bundle(bundle_path(match.group(1))).get(filename)
+
+
+def first_loose_month(today, keep_days):
+    """Oldest month that still has days within keep_days; earlier months are packed.
+
+    A month is packed once, after every day in it has aged out, so each
+    bundle is written a single time instead of being rebuilt daily.
+    """
+    cutoff = datetime.strptime(today, '%Y-%m-%d') - timedelta(days=keep_days)
+    return cutoff.strftime('%Y-%m')
+
+
+def pack_old_pages(today=None, keep_days=KEEP_LOOSE_DAYS, manifest=None):
+    """Move dated pages and digest data of fully aged-out months into monthly bundles"""
+    manifest = manifest or Manifest()
+    today = today or datetime.now().strftime('%Y-%m-%d')
+    before = first_loose_month(today, keep_days)
+
+    by_month = {}
+    for path in sorted(glob.glob(os.path.join(OUTPUT_DIR, 'news-summary-*.html'))):
+        match = PAGE_RE.match(os.path.basename(path))
+        if match and match.group(1) < before:
+            by_month.setdefault(match.group(1), []).append(path)
+
+    packed = 0
+    for month, paths in sorted(by_month.items()):
+        target = bundle_path(month)
+        pages = read_bundle(target)
+        for path in paths:
+            with open(path, 'rb') as f:
+                pages[os.path.basename(path)] = f.read()
+        data = build_bundle(pages)
+        os.makedirs(BUNDLE_DIR, exist_ok=True)
+        atomic_write(target, data)
+        manifest.record(target, content_hash(data))
+        for path in paths:
+            os.remove(path)
+            manifest.forget(path)
+        packed += len(paths)
+        print(f"📦 Packed {len(paths)} pages into {target} ({len(data) // 1024} KB)")
+
+    packed += pack_old_digests(before, manifest)
+    manifest.save()
+    return packed
+
+
+def pack_old_digests(before, manifest):
+    """Move digest data of months before `before` into monthly archives (see digest_format)"""
+    from digest_format import DigestError, pack_month
+
+    by_month = {}
+    for path in sorted(glob.glob(os.path.join(OUTPUT_DIR, 'news-data-*.json'))):
+        date_str = os.path.basename(path)[len('news-data-'):-len('.json')]
+        if date_str[:7] < before:
+            by_month.setdefault(date_str[:7], []).append(path)
+
+    for month, paths in sorted(by_month.items()):
+        try:
+            target, data = pack_month(month, paths)
+        except DigestError as e:
+            print(f"⚠️  Not packing {month} digests: {e}")
+            by_month[month] = []
+            continue
+        os.makedirs(BUNDLE_DIR, exist_ok=True)
+        atomic_write(target, data)
+        manifest.record(target, content_hash(data))
+        for path in paths:
+            os.remove(path)
+            manifest.forget(path)
+        print(f"📦 Packed {len(paths)} digests into {target}")
+    return sum(len(paths) for paths in by_month.values())
+
+
+def site_pages():
+    """{filename: bytes} for every page ever published.
+
+    Archived HTML is collected from the monthly bundles and output/
+    (loose files win), whether or not archive.json lists the day; days
+    with digest data are rendered from it instead.
+    """
+    from digest_format import iter_digests
+    from render_news import build_html
+
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(BUNDLE_DIR, 'news-summary-*.tar.xz'))):
+        pages.update(read_bundle(path))
+    for path in glob.glob(os.path.join(OUTPUT_DIR, '*.html')):
+        if os.path.basename(path) != 'latest.html':
+            with open(path, 'rb') as f:
+                pages[os.path.basename(path)] = f.read()
+    for date_str, digest in iter_digests():
+        pages[f'news-summary-{date_str}.html'] = build_html(digest, date_str).encode('utf-8')
+    return pages
+
+
+# Pages used to be served from output/ itself, so this was the site's latest.html
+LATEST_REDIRECT = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><meta http-equiv="refresh" content="0; url=output/latest.html">
+<link rel="canonical" href="output/latest.html"><title>Latest digest</title></head>
+<body><a href="output/latest.html">Latest digest</a></body></html>
+"""
+
+
+def build_site(site_dir=SITE_DIR):
+    """Write the full static site to site_dir: landing page, every month
+    page and dated page, and the feeds. Returns the number of dated pages."""
+    from update_index import update_landing_page
+
+    # A fresh checkout has no month pages, so all of them are regenerated
+    if not update_landing_page():
+        return 0
+
+    shutil.rmtree(site_dir, ignore_errors=True)
+    os.makedirs(os.path.join(site_dir, OUTPUT_DIR))
+    for path in SITE_FILES:
+        if os.path.exists(path):
+            shutil.copy2(path, os.path.join(site_dir, path))
+    for path in SITE_DIRS:
+        if os.path.isdir(path):
+            shutil.copytree(path, os.path.join(site_dir, path))
+
+    pages = site_pages()
+    for filename, data in pages.items():
+        with open(os.path.join(site_dir, OUTPUT_DIR, filename), 'wb') as f:
+            f.write(data)
+    dated = sorted(name for name in pages if PAGE_RE.match(name))
+    if dated:
+        shutil.copy2(os.path.join(site_dir, OUTPUT_DIR, dated[-1]), os.path.join(site_dir, OUTPUT_DIR, 'latest.html'))
+        with open(os.path.join(site_dir, 'latest.html'), 'w', encoding='utf-8') as f:
+            f.write(LATEST_REDIRECT)
+    print(f"🌐 Built {site_dir}/ with {len(dated)} dated pages")
+    return len(dated)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pack aged-out months and build the static site")
+    parser.add_argument('--pack', action='store_true', help="pack fully aged-out months into bundles")
+    parser.add_argument('--site', nargs='?', const=SITE_DIR, help=f"build the static site (default {SITE_DIR}/)")
+    args = parser.parse_args(argv)
+
+    if args.pack or not args.site:
+        packed = pack_old_pages()
+        print(f"✅ {packed} files packed")
+    if args.site:
+        build_site(args.site)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import json
+import time
+import numpy as np
+
+RECENCY_FILE = 'recency.json'
+
+
+class RecencyPolicy:
+    """Per-source recency windows and freshness decay over UTC epoch times.
+
+    Items carry `published` as UTC epoch seconds (0 when the feed gave no
+    date), so every comparison here is timezone-independent and can be done
+    over a whole item array at once.
+    """
+
+    def __init__(self, config):
+        self.default_window = config.get('default_window_hours', 48) * 3600
+        self.half_life = config.get('half_life_hours', 24) * 3600
+        self.keep_undated = config.get('keep_undated', True)
+        self.undated_age = config.get('undated_age_hours', 24) * 3600
+        self.windows = {name: hours * 3600 for name, hours in config.get('sources', {}).items()}
+
+    @classmethod
+    def from_file(cls, path=RECENCY_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @property
+    def max_window(self):
+        """Longest window of any source; older items are never ranked again"""
+        return max([self.default_window, *self.windows.values()])
+
+    def window_for(self, source):
+        return self.windows.get(source, self.default_window)
+
+    def cutoff(self, source, now=None):
+        """Oldest epoch still inside the source's window"""
+        return int((now or time.time()) - self.window_for(source))
+
+    def arrays(self, items):
+        """Published times and per-item window lengths as int64 arrays"""
+        published = np.fromiter((item.published for item in items), dtype=np.int64, count=len(items))
+        window_cache = {}
+        windows = np.fromiter(
+            (window_cache.setdefault(item.source, self.window_for(item.source)) for item in items),
+            dtype=np.int64, count=len(items)
+        )
+        return published, windows
+
+    def ages(self, published, now=None):
+        """Age in seconds; undated items get the configured neutral age"""
+        now = int(now or time.time())
+        ages = np.maximum(now - published, 0)
+        return np.where(published > 0, ages, self.undated_age)
+
+    def recent_mask(self, items, now=None):
+        published, windows = self.arrays(items)
+        ages = self.ages(published, now)
+        mask = ages <= windows
+        if not self.keep_undated:
+            mask &= published > 0
+        return mask
+
+    def decay_scores(self, items, now=None):
+        """Freshness in (0, 1]: halves every half_life hours"""
+        published, _ = self.arrays(items)
+        ages = self.ages(published, now)
+        return np.exp2(-ages / self.half_life).astype(np.float32)
+
+    def filter_recent(self, items, now=None):
+        """Items inside their source's window"""
+        if not items:
+            return items
+        mask = self.recent_mask(items, now)
+        return [item for item, keep in zip(items, mask) if keep]
+
+
+_default_policy = None
+
+
+def get_policy():
+    """Shared policy loaded from recency.json"""
+    global _default_policy
+    if _default_policy is None:
+        _default_policy = RecencyPolicy.from_file()
+    return _default_policy
+
+
+def filter_recent(items, now=None):
+    return get_policy().filter_recent(items, now)
+
+
+def decay_scores(items, now=None):
+    return get_policy().decay_scores(items, now)
@@ -1,23 +1,19 @@
-import json
+from html import escape
 from datetime import datetime
 
-def render_news():
-    """Render JSON data into HTML template"""
-    
-    # Load JSON data
-    try:
-        with open('output/latest-data.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except FileNotFoundError:
-        print("❌ No data file found. Run generate_news_json.py first.")
-        return
+from output_writer import Checkpoints
+from publish import publish
+
+def build_html(data, date_str=None):
+    """Fill the news template from digest data; date_str is the digest's day (default today)"""
     
     # Load template
     with open('news-template.html', 'r', encoding='utf-8') as f:
         template = f.read()
     
     # Prepare data
-    current_date = datetime.now().strftime("%B %d, %Y")
+    day = datetime.strptime(date_str, "%Y-%m-%d") if date_str else datetime.now()
+    current_date = day.strftime("%B %d, %Y")
     story_count = len(data['stories'])
     action_count = len(data['actions'])
     
@@ -33,14 +29,29 @@ def render_news():
         relevance = story['relevance_score']
         relevance_class = 'high' if relevance >= 8 else 'medium' if relevance >= 6 else ''
         
+        entities = story.get('entities') or []
+        # Entity names can come from the profile and repo titles, so escape them
+        entity_badges = ''.join(f'<span class="entity-badge" data-entity="{escape(e)}">{escape(e)}</span>' for e in entities)
+        
+        # Earlier coverage from the story graph, linked to the day's page
+        related_html = ''
+        if story.get('related'):
+            links = ''.join(
+                f'<li><a href="news-summary-{r["date"]}.html#story-{r["id"]}">{r["title"]}</a> <span>{r["date"]}</span></li>'
+                for r in story['related']
+            )
+            related_html = f'<div class="story-related"><div class="story-related-label">Earlier Coverage</div><ul>{links}</ul></div>'
+        anchor = f' id="story-{story["id"]}"' if story.get('id') else ''
+        
         story_html = f'''
-        <div class="story-card">
+        <div class="story-card"{anchor} data-entities="{escape('|'.join(entities))}">
             <div class="story-header">
                 <div class="story-meta">
                     <span class="relevance-badge {relevance_class}">
                         {'⭐' * min(int(relevance), 10)} {relevance}/10
                     </span>
                     <span class="category-badge">{story['category']}</span>
+                    {entity_badges}
                 </div>
             </div>
             
@@ -57,6 +68,8 @@ def render_news():
                 <div class="why-relevant-text">{story['why_relevant']}</div>
             </div>
             
+            {related_html}
+            
             <div class="story-footer">
                 <span>{story['date']}</span>
                 <a href="{story['url']}" class="source-link" target="_blank" rel="noopener noreferrer">
@@ -67,14 +80,29 @@ def render_news():
         '''
         stories_html.append(story_html)
     
+    # Build entity filter bar, most mentioned first
+    mention_counts = {}
+    for story in data['stories']:
+        for entity in story.get('entities') or []:
+            mention_counts[entity] = mention_counts.get(entity, 0) + 1
+    entity_filters = ''.join(
+        f'<span class="entity-badge" data-entity="{escape(e)}">{escape(e)} ({n})</span>'
+        for e, n in sorted(mention_counts.items(), key=lambda kv: kv[1], reverse=True)
+    )
+    
     # Build actions HTML
     actions_html = []
     for action in data['actions']:
         action_type_lower = action['type'].lower()
         priority_lower = action['priority'].lower()
         
-        related_count = len(action.get('related_stories', []))
-        related_text = f"Related to {related_count} " + ("story" if related_count == 1 else "stories")
+        titles = {story.get('id'): story['title'] for story in data['stories']}
+        related_ids = [i for i in action.get('related_ids', []) if i in titles]
+        if related_ids:
+            related_text = 'Related: ' + ' · '.join(f'<a href="#story-{i}">{titles[i]}</a>' for i in related_ids)
+        else:
+            related_count = len(action.get('related_stories', []))
+            related_text = f"Related to {related_count} " + ("story" if related_count == 1 else "stories")
         
         action_html = f'''
         <div class="action-card {priority_lower}">
@@ -108,21 +136,50 @@ def render_news():
     html = html.replace('{{PATTERNS}}', patterns_html)
     html = html.replace('{{SIGNALS}}', signals_html)
     html = html.replace('{{BOTTOM_LINE}}', data['smart_digest']['bottom_line'])
+    html = html.replace('{{ENTITY_FILTERS}}', entity_filters)
     html = html.replace('{{STORIES}}', '\n'.join(stories_html))
     html = html.replace('{{ACTIONS}}', '\n'.join(actions_html))
     
-    # Save HTML
+    return html
+
+def render_news():
+    """Render JSON data into HTML template"""
+    
     timestamp = datetime.now().strftime("%Y-%m-%d")
-    html_filename = f"output/news-summary-{timestamp}.html"
+    checkpoints = Checkpoints(timestamp)
     
-    with open(html_filename, 'w', encoding='utf-8') as f:
-        f.write(html)
+    # Load, migrate and validate the digest
+    from digest_format import load_digest, DigestError
+    try:
+        data = load_digest('output/latest-data.json')
+    except FileNotFoundError:
+        print("❌ No data file found. Run generate_news_json.py first.")
+        return
+    except DigestError as e:
+        print(f"❌ Invalid digest data: {e}")
+        return
+    
+    rendered = checkpoints.load('rendered')
+    if rendered is not None:
+        html = rendered['html']
+    else:
+        html = build_html(data, timestamp)
+        checkpoints.save('rendered', {'html': html})
+    
+    # Save HTML and the story feeds
+    from feeds import feed_artifacts, prune_feeds
+    html_filename = f"output/news-summary-{timestamp}.html"
+    artifacts = {html_filename: html, "output/latest.html": html}
+    artifacts.update(feed_artifacts(data, timestamp))
+    publish(artifacts)
+    prune_feeds(timestamp)
     
-    with open("output/latest.html", 'w', encoding='utf-8') as f:
-        f.write(html)
+    # Outputs are published; the next run starts fresh
+    checkpoints.clear()
     
     print(f"✅ Rendered {html_filename}")
     print(f"✅ Also saved as output/latest.html")
+    print("✅ Story feeds written to output/feeds/")
 
 if __name__ == "__main__":
     render_news()
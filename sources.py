@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import requests
+import feedparser
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+from github_collector import GitHubCollector, TokenBucket
+
+SOURCES_FILE = 'sources.json'
+
+ADAPTERS = {}
+
+
+def register(kind):
+    """Class decorator adding an adapter to the registry under a sources.json kind"""
+    def wrap(cls):
+        cls.kind = kind
+        ADAPTERS[kind] = cls
+        return cls
+    return wrap
+
+
+class SourceAdapter:
+    """One news source.
+
+    Subclasses declare their relative fetch cost (the scheduler starts costly
+    sources first), a budget of rate_limit requests per rate_period seconds
+    shared by every adapter on the same rate_key, and implement fetch_raw()
+    plus normalize().
+    """
+
+    kind = None
+    cost = 1
+    rate_limit = None
+    rate_period = 60
+    limit = 10
+
+    def __init__(self, name, **options):
+        self.name = name
+        self.options = options
+        self.limit = options.get('limit', self.limit)
+        self.limiter = None
+
+    @property
+    def rate_key(self):
+        return self.kind
+
+    def throttle(self):
+        if self.limiter is not None:
+            self.limiter.acquire()
+
+    def fetch_raw(self):
+        raise NotImplementedError
+
+    def normalize(self, raw):
+        """Map one raw record to the fetcher dict shape normalize_item() expects"""
+        return raw
+
+    def fetch(self):
+        return [self.normalize(raw) for raw in self.fetch_raw()][:self.limit]
+
+
+@register('rss')
+class RSSAdapter(SourceAdapter):
+    cost = 1
+
+    @property
+    def rate_key(self):
+        return urlparse(self.options['url']).netloc
+
+    def fetch_raw(self):
+        from feed_reader import MAX_BYTES, read_feed
+        from recency import get_policy
+
+        self.throttle()
+        # Streamed: the read stops at the source's recency window or limit
+        return read_feed(
+            self.options['url'],
+            cutoff=get_policy().cutoff(self.name),
+            limit=self.limit,
+            max_bytes=self.options.get('max_bytes', MAX_BYTES),
+        )
+
+    def normalize(self, entry):
+        return dict(entry, source=self.name)
+
+
+@register('github')
+class GitHubAdapter(SourceAdapter):
+    cost = 8
+
+    @property
+    def rate_limit(self):
+        # Search API: 30 requests/minute with a token, 10 without
+        return 30 if os.environ.get('GITHUB_TOKEN') else 10
+
+    def fetch_raw(self):
+        # The shared bucket is corrected from X-RateLimit-* headers inside the collector
+        collector = GitHubCollector(queries=self.options.get('queries'), bucket=self.limiter)
+        return collector.collect(limit=self.limit)
+
+
+@register('product_hunt')
+class ProductHuntAdapter(SourceAdapter):
+    cost = 2
+    rate_limit = 60
+
+    QUERY = """
+    {
+      posts(first: %d, order: VOTES, postedAfter: "%s") {
+        edges {
+          node {
+            name
+            tagline
+            votesCount
+            url
+            createdAt
+          }
+        }
+      }
+    }
+    """
+
+    def fetch_raw(self):
+        api_key = os.environ.get('PRODUCTHUNT_API_KEY')
+        if not api_key:
+            print("    Product Hunt API key not set, skipping...")
+            return []
+
+        posted_after = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() - 2 * 86400))
+        self.throttle()
+        response = requests.post(
+            "https://api.producthunt.com/v2/api/graphql",
+            json={'query': self.QUERY % (self.limit, posted_after)},
+            headers={
+                'Authorization': f'Bearer {api_key}',
+                'Content-Type': 'application/json'
+            },
+            timeout=15
+        )
+        response.raise_for_status()
+        return [edge['node'] for edge in response.json()['data']['posts']['edges']]
+
+    def normalize(self, node):
+        return {
+            'title': node['name'],
+            'link': node['url'],
+            'summary': node['tagline'],
+            'votes': node['votesCount'],
+            'published': node.get('createdAt'),
+            'source': self.name
+        }
+
+
+@register('hacker_news')
+class HackerNewsAdapter(SourceAdapter):
+    cost = 2
+    rate_limit = 100
+
+    def fetch_raw(self):
+        self.throttle()
+        response = requests.get(
+            "https://hn.algolia.com/api/v1/search",
+            params={
+                'tags': 'front_page',
+                'numericFilters': f"points>={self.options.get('min_points', 0)}",
+                'hitsPerPage': self.limit
+            },
+            timeout=10
+        )
+        response.raise_for_status()
+        return response.json()['hits']
+
+    def normalize(self, hit):
+        discussion = f"https://news.ycombinator.com/item?id={hit['objectID']}"
+        return {
+            'title': hit['title'],
+            'link': hit.get('url') or discussion,
+            'summary': f"{hit.get('points', 0)} points, {hit.get('num_comments', 0)} comments ({discussion})",
+            'votes': hit.get('points'),
+            'published': hit.get('created_at_i'),
+            'source': self.name
+        }
+
+
+@register('arxiv')
+class ArxivAdapter(SourceAdapter):
+    cost = 3
+    # arXiv asks for no more than one request every three seconds
+    rate_limit = 1
+    rate_period = 3
+
+    def fetch_raw(self):
+        categories = self.options.get('categories', ['cs.AI'])
+        query = ' OR '.join(f'cat:{c}' for c in categories)
+        self.throttle()
+        response = requests.get(
+            "http://export.arxiv.org/api/query",
+            params={
+                'search_query': query,
+                'sortBy': 'submittedDate',
+                'sortOrder': 'descending',
+                'max_results': self.limit
+            },
+            timeout=20
+        )
+        response.raise_for_status()
+        return feedparser.parse(response.content).entries
+
+    def normalize(self, entry):
+        return {
+            'title': entry.title,
+            'link': entry.link,
+            'summary': entry.get('summary', ''),
+            'published': entry.get('published_parsed'),
+            'source': self.name
+        }
+
+
+def load_sources(path=SOURCES_FILE):
+    """Instantiate enabled adapters from sources.json"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    adapters = []
+    for entry in config['sources']:
+        options = dict(entry)
+        kind = options.pop('kind')
+        if not options.pop('enabled', True):
+            continue
+        if kind not in ADAPTERS:
+            print(f"⚠️  Unknown source kind '{kind}', skipping")
+            continue
+        adapters.append(ADAPTERS[kind](options.pop('name', kind), **options))
+    return adapters, config.get('max_workers', 8)
+
+
+def _fetch_one(adapter):
+    start = time.time()
+    try:
+        items = adapter.fetch()
+    except Exception as e:
+        print(f"  Error fetching {adapter.name}: {e}")
+        return []
+    print(f"  {adapter.name}: {len(items)} items ({time.time() - start:.1f}s)")
+    return items
+
+
+def fetch_all(adapters, max_workers=8):
+    """Fetch every adapter concurrently, sharing rate limiters per rate_key.
+
+    Returns {adapter kind: [raw item dicts]} so callers can still tell
+    sources apart before normalization.
+    """
+    limiters = {}
+    for adapter in adapters:
+        if adapter.rate_limit:
+            adapter.limiter = limiters.setdefault(
+                adapter.rate_key,
+                TokenBucket(capacity=adapter.rate_limit, period=adapter.rate_period, name=adapter.rate_key))
+
+    # Longest fetches first so they overlap with the many cheap ones
+    ordered = sorted(adapters, key=lambda a: a.cost, reverse=True)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for adapter, items in zip(ordered, pool.map(_fetch_one, ordered)):
+            results.setdefault(adapter.kind, []).extend(items)
+    return results
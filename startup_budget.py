@@ -0,0 +1,65 @@
+import re
+import sys
+import time
+import subprocess
+
+# Cold-start budget for commands that never touch the network
+BUDGET_MS = 100
+
+COMMANDS = {
+    'pipeline --list': "import pipeline; pipeline.main(['--list'])",
+    'render': "import render_news",
+    'index': "import update_index",
+    'archive': "from transform_news import update_archive_json",
+}
+
+# Heavy dependencies that these commands must not import at startup
+FORBIDDEN = ['requests', 'feedparser', 'bs4', 'lxml', 'numpy', 'aiohttp']
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+
+def measure(statement, runs=3):
+    """Best-of-N wall time plus the -X importtime breakdown of the last run"""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', statement],
+            capture_output=True, text=True
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent)))
+    return best, modules
+
+
+def main():
+    """Report cold-start time per command and fail when over budget"""
+    failed = False
+    for command, statement in COMMANDS.items():
+        wall_ms, modules = measure(statement)
+        names = {name.split('.')[0] for name, _, _, _ in modules}
+        heavy = [dep for dep in FORBIDDEN if dep in names]
+        slowest = sorted(modules, key=lambda m: m[1], reverse=True)[:3]
+
+        ok = wall_ms <= BUDGET_MS and not heavy
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {command:<16} {wall_ms:6.1f} ms (budget {BUDGET_MS} ms)")
+        print(f"     slowest: {', '.join(f'{n} {s / 1000:.1f}ms' for n, s, _, _ in slowest)}")
+        if heavy:
+            print(f"     imports heavy dependencies: {', '.join(heavy)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import os
+import json
+import zlib
+import numpy as np
+
+from embeddings import EmbeddingCache
+from history_store import extract_terms
+from news_item import story_id
+from output_writer import atomic_write
+
+GRAPH_DIR = os.path.join('cache', 'story-graph')
+
+# Hashed term features; collisions are rare enough at digest scale
+DIM = 1024
+NEIGHBORS = 3
+MIN_SIMILARITY = 0.3
+
+
+def vectorize(stories):
+    """L2-normalized hashed term vectors (signed feature hashing).
+
+    crc32 rather than hash() so vectors are identical across processes.
+    """
+    matrix = np.zeros((len(stories), DIM), dtype=np.float32)
+    for row, story in enumerate(stories):
+        terms = extract_terms(f"{story.get('title', '')} {story.get('summary', '')}")
+        terms += [f"entity:{e}" for e in story.get('entities') or []]
+        for term in terms:
+            h = zlib.crc32(term.encode('utf-8'))
+            matrix[row, h % DIM] += 1.0 if h & 0x80000000 else -1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-9)
+
+
+class StoryGraph:
+    """Persistent story nodes with cross-day nearest-neighbor edges.
+
+    Vectors live in an append-only memory-mapped matrix, so each run only
+    vectorizes and searches its new stories against the existing nodes;
+    nothing already indexed is recomputed.
+    """
+
+    def __init__(self, directory=GRAPH_DIR):
+        self.directory = directory
+        self.nodes_path = os.path.join(directory, 'nodes.json')
+        self.vectors = EmbeddingCache('story-graph', DIM, cache_dir=directory)
+        try:
+            with open(self.nodes_path, 'r', encoding='utf-8') as f:
+                self.nodes = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.nodes = {}
+        self.ids = sorted(self.vectors.index, key=self.vectors.index.get)
+
+    def _link(self, source, target, score):
+        related = [r for r in self.nodes[source]['related'] if r[0] != target]
+        related.append([target, round(score, 3)])
+        related.sort(key=lambda r: r[1], reverse=True)
+        self.nodes[source]['related'] = related[:NEIGHBORS]
+
+    def add_day(self, date_str, stories):
+        """Index the day's new stories and link them to earlier days"""
+        new = list({s['id']: s for s in stories if s['id'] not in self.nodes}.values())
+        if not new:
+            return 0
+
+        vectors = vectorize(new)
+        existing = len(self.ids)
+        if existing:
+            sims = vectors @ np.asarray(self.vectors.matrix[:existing]).T
+            # Only cross-day edges: same-day stories are already on the page
+            same_day = np.array([self.nodes[i]['date'] == date_str for i in self.ids])
+            sims[:, same_day] = -1.0
+        else:
+            sims = np.zeros((len(new), 0), dtype=np.float32)
+
+        for row, story in enumerate(new):
+            self.nodes[story['id']] = {
+                'title': story.get('title', ''),
+                'url': story.get('url', ''),
+                'date': date_str,
+                'related': [],
+            }
+            top = np.argsort(sims[row])[::-1][:NEIGHBORS]
+            for col in top:
+                score = float(sims[row, col])
+                if score < MIN_SIMILARITY:
+                    break
+                self._link(story['id'], self.ids[col], score)
+                self._link(self.ids[col], story['id'], score)
+
+        self.vectors.add([s['id'] for s in new], vectors)
+        self.ids.extend(s['id'] for s in new)
+        return len(new)
+
+    def related(self, node_id):
+        """Neighbor summaries for one node, best first"""
+        links = []
+        for other, score in self.nodes.get(node_id, {}).get('related', []):
+            node = self.nodes.get(other)
+            if node:
+                links.append({'id': other, 'title': node['title'], 'url': node['url'], 'date': node['date'], 'score': score})
+        return links
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.vectors.save()
+        atomic_write(self.nodes_path, json.dumps(self.nodes, ensure_ascii=False))
+
+
+def build_graph(digest, date_str, graph=None):
+    """Assign story ids, resolve action references and attach cross-day links"""
+    graph = graph or StoryGraph()
+    stories = digest.get('stories', [])
+    for story in stories:
+        story['id'] = story_id(story.get('url') or story.get('title', ''))
+
+    # The model cites stories by position; ids survive any later reordering
+    for action in digest.get('actions', []):
+        positions = [i for i in action.get('related_stories', []) if isinstance(i, int) and 0 <= i < len(stories)]
+        action['related_ids'] = list(dict.fromkeys(stories[i]['id'] for i in positions))
+
+    added = graph.add_day(date_str, stories)
+    for story in stories:
+        story['related'] = [link for link in graph.related(story['id']) if link['date'] != date_str]
+    graph.save()
+    print(f"🕸️  Story graph: {added} new nodes, {len(graph.nodes)} total")
+    return digest
@@ -0,0 +1,25 @@
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from news_item import NewsItem
+
+
+def test_rank_items_without_sentence_transformers(monkeypatch):
+    """NEWS_EMBEDDINGS=1 without the package falls back to freshness order"""
+    from generate_news_json import rank_items
+
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setenv('NEWS_EMBEDDINGS', '1')
+    # A None entry makes the import raise ImportError even where it is installed
+    monkeypatch.setitem(sys.modules, 'sentence_transformers', None)
+
+    now = int(time.time())
+    items = [NewsItem(f'Item {i}', f'https://example.com/{i}', '', 'Test', now - i * 3600) for i in (3, 1, 2)]
+    ranked = rank_items(items, {})
+
+    assert [item.title for item in ranked] == ['Item 1', 'Item 2', 'Item 3']
+    assert all(item.relevance_prescore is None for item in ranked)
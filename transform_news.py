@@ -2,10 +2,13 @@ import os
 import json
 import re
 from datetime import datetime
-from bs4 import BeautifulSoup
+
+from output_writer import atomic_write, atomic_write_json
 
 def extract_stories_from_html(html_file):
     """Extract stories from generated news HTML"""
+    from bs4 import BeautifulSoup
+    
     with open(html_file, 'r', encoding='utf-8') as f:
         soup = BeautifulSoup(f.read(), 'html.parser')
     
@@ -187,10 +190,13 @@ def create_interactive_viewer(stories_data, output_file):
                           f'data-count="{category}">{count} {unit}</span>')
     
     # Write output
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    atomic_write(output_file, html)
+
+def save_archive(archive, archive_file='archive.json'):
+    archive['summaries'].sort(key=lambda x: x['date'], reverse=True)
+    atomic_write_json(archive_file, archive)
 
-def update_archive_json(date_str, filename):
+def update_archive_json(date_str, filename, metadata=None):
     """Update archive.json with new summary"""
     archive_file = 'archive.json'
     
@@ -214,20 +220,17 @@ def update_archive_json(date_str, filename):
         'display_date': date_str,
         'file': filename
     }
+    # Story count, top categories and TL;DR for the landing and archive pages
+    if metadata:
+        new_entry.update(metadata)
     
     # Remove if already exists
     archive['summaries'] = [s for s in archive['summaries'] if s['date'] != formatted_date]
     
-    # Add and sort by date (newest first)
+    # Add and sort by date (newest first); the full history backs the
+    # paginated archive pages
     archive['summaries'].append(new_entry)
-    archive['summaries'].sort(key=lambda x: x['date'], reverse=True)
-    
-    # Keep only last 30 days
-    archive['summaries'] = archive['summaries'][:30]
-    
-    # Save
-    with open(archive_file, 'w') as f:
-        json.dump(archive, f, indent=2)
+    save_archive(archive, archive_file)
     
     print(f"✅ Archive updated: {len(archive['summaries'])} summaries")
 
@@ -0,0 +1,94 @@
+import numpy as np
+
+from history_store import HistoryStore, date_to_day, day_to_date
+
+RECENT_DAYS = 3
+BASELINE_DAYS = 14
+MIN_RECENT = 3
+# Days loaded before the baseline: load() keeps a URL's first run, and articles
+# repeat for the 48h recency window, so carry-overs keep their original day
+CARRYOVER_DAYS = 2
+
+
+def day_counts(columns, kind, first_day, n_days, vocab_size):
+    """(n_days, vocab_size) matrix of items mentioning each term/entity per day"""
+    lengths = np.diff(columns[f'{kind}_offsets'])
+    mention_days = np.repeat(columns['day'], lengths) - first_day
+    in_range = (mention_days >= 0) & (mention_days < n_days)
+    flat = mention_days[in_range].astype(np.int64) * vocab_size + columns[f'{kind}_ids'][in_range]
+    return np.bincount(flat, minlength=n_days * vocab_size).reshape(n_days, vocab_size)
+
+
+def rising_scores(counts, recent_days=RECENT_DAYS):
+    """Poisson-style surprise of the recent window against the baseline rate.
+
+    Returns (score, recent, expected) arrays over terms; terms with no
+    baseline still score by their recent count.
+    """
+    baseline_days = counts.shape[0] - recent_days
+    recent = counts[-recent_days:].sum(axis=0)
+    baseline_rate = counts[:-recent_days].sum(axis=0) / max(baseline_days, 1)
+    expected = baseline_rate * recent_days
+    score = (recent - expected) / np.sqrt(expected + 1)
+    return score, recent, expected
+
+
+def ranked(vocab, counts, recent_days, top, min_recent, only=None):
+    """Describe the top rising ids, optionally restricted to the `only` ids"""
+    score, recent, expected = rising_scores(counts, recent_days)
+    candidates = np.flatnonzero(recent >= min_recent) if only is None else np.asarray(only, dtype=np.int64)
+    order = candidates[np.argsort(score[candidates])[::-1]]
+    return [
+        {
+            'term': vocab[i],
+            'recent': int(recent[i]),
+            'expected': round(float(expected[i]), 1),
+            'score': round(float(score[i]), 2),
+        }
+        for i in order[:top]
+        if recent[i] > 0 and (only is not None or score[i] > 0)
+    ]
+
+
+def compute_trends(as_of, tracked=(), store=None, recent_days=RECENT_DAYS,
+                   baseline_days=BASELINE_DAYS, top=8, min_recent=MIN_RECENT):
+    """Rising terms, entities and tracked companies over windows ending at as_of"""
+    store = store or HistoryStore()
+    end_day = date_to_day(as_of)
+    first_day = end_day - recent_days - baseline_days + 1
+    n_days = recent_days + baseline_days
+    columns = store.load(since=day_to_date(first_day - CARRYOVER_DAYS), until=as_of)
+    if columns is None or not len(columns['day']):
+        return None
+
+    terms = store.vocab.get('terms', [])
+    entities = store.vocab.get('entities', [])
+    term_counts = day_counts(columns, 'term', first_day, n_days, len(terms))
+    entity_counts = day_counts(columns, 'entity', first_day, n_days, len(entities))
+
+    entity_ids = store.index.get('entities', {})
+    tracked_ids = [entity_ids[name] for name in tracked if name in entity_ids]
+
+    in_window = columns['day'] >= first_day
+    return {
+        'as_of': as_of,
+        'days': int(np.unique(columns['day'][in_window]).size),
+        'items': int(in_window.sum()),
+        'rising_terms': ranked(terms, term_counts, recent_days, top, min_recent),
+        'rising_entities': ranked(entities, entity_counts, recent_days, top, min_recent),
+        'tracked': ranked(entities, entity_counts, recent_days, len(tracked_ids), 0, only=tracked_ids),
+    }
+
+
+def format_signals(trends):
+    """Prompt-ready lines describing computed signals"""
+    if not trends:
+        return []
+    lines = []
+    for t in trends.get('rising_entities', []):
+        lines.append(f"Rising: {t['term']} in {t['recent']} items over {RECENT_DAYS}d (baseline expects {t['expected']})")
+    for t in trends['rising_terms']:
+        lines.append(f"'{t['term']}' in {t['recent']} items over {RECENT_DAYS}d (baseline expects {t['expected']})")
+    for t in trends['tracked']:
+        lines.append(f"Tracked '{t['term']}': {t['recent']} items over {RECENT_DAYS}d (baseline expects {t['expected']})")
+    return lines
@@ -1,54 +1,285 @@
-import json
 import os
+import sys
+import json
+from html import escape
+from datetime import datetime, timezone
+
+from publish import publish
+
+ARCHIVE_FILE = 'archive.json'
+INDEX_FILE = 'index.html'
+ARCHIVE_DIR = 'archive'
+ARCHIVE_TEMPLATE = 'archive-template.html'
+
+LANDING_DAYS = 7
+FEED_DAYS = 30
+SITE_TITLE = 'Tech News Daily'
+
+
+def pages_url(repository):
+    """GitHub Pages URL for an owner/name repository, or '' when unknown"""
+    owner, _, name = repository.partition('/')
+    if not owner or not name:
+        return ''
+    if name.lower() == f'{owner.lower()}.github.io':
+        return f'https://{name.lower()}'
+    return f'https://{owner.lower()}.github.io/{name}'
+
+
+# NEWS_SITE_URL for custom domains; Actions sets GITHUB_REPOSITORY for the default Pages URL
+SITE_URL = (os.environ.get('NEWS_SITE_URL') or pages_url(os.environ.get('GITHUB_REPOSITORY', ''))).rstrip('/')
+
+# Splice points in index.html; only the text between them is regenerated
+START_MARKER = '<!-- archive:start -->'
+END_MARKER = '<!-- archive:end -->'
+
+
+def load_archive():
+    try:
+        with open(ARCHIVE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def digest_metadata(digest):
+    """Per-day card metadata from a digest"""
+    counts = {}
+    for story in digest.get('stories', []):
+        category = story.get('category') or 'General Tech'
+        counts[category] = counts.get(category, 0) + 1
+    top = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:3]
+    return {
+        'story_count': len(digest.get('stories', [])),
+        'action_count': len(digest.get('actions', [])),
+        'top_categories': [name for name, _ in top],
+        'tldr': digest.get('smart_digest', {}).get('tldr', ''),
+    }
+
+
+def card_html(entry, prefix='./', indent=16):
+    # Every dated page is rendered into the site (publish.build_site), packed or not
+    href = prefix + entry['file']
+    if 'story_count' in entry:
+        meta = f"{entry['story_count']} stories"
+        if entry.get('action_count'):
+            meta += f" · {entry['action_count']} actions"
+        if entry.get('top_categories'):
+            meta += ' · ' + ', '.join(entry['top_categories'])
+    else:
+        meta = 'Tech news digest'
+    preview = entry.get('tldr') or 'Stories, analysis and actionable insights.'
+    pad = ' ' * indent
+    return (
+        f'{pad}<a href="{escape(href)}" class="archive-card">\n'
+        f'{pad}    <div class="archive-date">{escape(entry["display_date"])}</div>\n'
+        f'{pad}    <div class="archive-meta">{escape(meta)}</div>\n'
+        f'{pad}    <div class="archive-preview">{escape(preview)}</div>\n'
+        f'{pad}</a>\n'
+    )
+
+
+def landing_html(index_html, summaries):
+    """index.html with the recent cards replaced, or None if the markers are missing"""
+    start = index_html.find(START_MARKER)
+    end = index_html.find(END_MARKER)
+    if start == -1 or end < start:
+        return None
+    cards = ''.join(card_html(entry) for entry in summaries[:LANDING_DAYS])
+    more = (f'                <a href="./{ARCHIVE_DIR}/index.html" class="archive-card">\n'
+            f'                    <div class="archive-date">All {len(summaries)} digests →</div>\n'
+            f'                    <div class="archive-preview">Browse the archive by month.</div>\n'
+            f'                </a>\n')
+    return (index_html[:start + len(START_MARKER)] + '\n' + cards + more
+            + '                ' + index_html[end:])
+
+
+def by_month(summaries):
+    months = {}
+    for entry in summaries:
+        months.setdefault(entry['date'][:7], []).append(entry)
+    return months
+
+
+def month_label(month):
+    return datetime.strptime(month, '%Y-%m').strftime('%B %Y')
+
+
+def fill_template(template, title, subtitle, pager, cards):
+    html = template.replace('{{TITLE}}', escape(title))
+    html = html.replace('{{SUBTITLE}}', escape(subtitle))
+    html = html.replace('{{PAGER}}', pager)
+    return html.replace('{{CARDS}}', cards)
+
 
-def update_landing_page():
-    """Update index.html with latest archive entries"""
-    
-    # Load archive
-    archive_file = 'archive.json'
-    if not os.path.exists(archive_file):
+def month_page(template, month, entries, newer, older):
+    pager = (f'<a href="{older}.html">← {month_label(older)}</a>' if older else '<span></span>')
+    pager += (f'<a href="{newer}.html">{month_label(newer)} →</a>' if newer else '<span></span>')
+    stories = sum(e.get('story_count', 0) for e in entries)
+    subtitle = f"{len(entries)} digests" + (f", {stories} stories" if stories else '')
+    cards = ''.join(card_html(entry, prefix='../', indent=12) for entry in entries)
+    return fill_template(template, month_label(month), subtitle, pager, cards)
+
+
+def months_page(template, months):
+    cards = ''
+    for month, entries in months.items():
+        stories = sum(e.get('story_count', 0) for e in entries)
+        cards += (f'            <a href="{month}.html" class="archive-card">\n'
+                  f'                <div class="archive-date">{month_label(month)}</div>\n'
+                  f'                <div class="archive-meta">{len(entries)} digests'
+                  + (f' · {stories} stories' if stories else '') + '</div>\n'
+                  f'            </a>\n')
+    return fill_template(template, 'Archive', f"{len(months)} months of digests", '', cards)
+
+
+def published_at(entry):
+    # Digests are generated by the 07:00 UTC workflow
+    return datetime.strptime(entry['date'], '%Y-%m-%d').replace(hour=7, tzinfo=timezone.utc)
+
+
+def json_feed(summaries):
+    items = []
+    for entry in summaries[:FEED_DAYS]:
+        url = f"{SITE_URL}/{entry['file']}"
+        item = {
+            'id': url,
+            'url': url,
+            'title': entry['display_date'],
+            'content_text': entry.get('tldr') or 'Daily tech news digest',
+            'date_published': published_at(entry).isoformat().replace('+00:00', 'Z'),
+        }
+        if entry.get('top_categories'):
+            item['tags'] = entry['top_categories']
+        items.append(item)
+    feed = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': SITE_TITLE,
+        'home_page_url': f"{SITE_URL}/",
+        'feed_url': f"{SITE_URL}/feed.json",
+        'items': items,
+    }
+    return json.dumps(feed, ensure_ascii=False, indent=2)
+
+
+def rss_feed(summaries):
+    from email.utils import format_datetime
+
+    items = []
+    for entry in summaries[:FEED_DAYS]:
+        url = escape(f"{SITE_URL}/{entry['file']}")
+        items.append(
+            '    <item>\n'
+            f'      <title>{escape(entry["display_date"])}</title>\n'
+            f'      <link>{url}</link>\n'
+            f'      <guid isPermaLink="true">{url}</guid>\n'
+            f'      <pubDate>{format_datetime(published_at(entry))}</pubDate>\n'
+            f'      <description>{escape(entry.get("tldr") or "Daily tech news digest")}</description>\n'
+            + ''.join(f'      <category>{escape(c)}</category>\n' for c in entry.get('top_categories', []))
+            + '    </item>\n'
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0">\n'
+        '  <channel>\n'
+        f'    <title>{SITE_TITLE}</title>\n'
+        f'    <link>{escape(SITE_URL)}/</link>\n'
+        '    <description>Personalized daily tech news digests</description>\n'
+        + ''.join(items)
+        + '  </channel>\n'
+        '</rss>\n'
+    )
+
+
+def update_landing_page(date_str=None):
+    """Regenerate the landing page, archive month pages and digest feeds.
+
+    With date_str only that day's month page is rebuilt; the landing page
+    and feeds always are. Unchanged files are not rewritten.
+    """
+    archive = load_archive()
+    if archive is None:
         print("❌ archive.json not found - run transform_news.py first")
-        return
-    
-    with open(archive_file, 'r') as f:
-        archive = json.load(f)
-    
-    # Read index.html
-    index_file = 'index.html'
-    if not os.path.exists(index_file):
-        print("❌ index.html not found")
-        return
-    
-    with open(index_file, 'r') as f:
-        index_html = f.read()
-    
-    # Generate archive cards HTML
-    archive_html = ""
-    for summary in archive['summaries'][:7]:  # Last 7 days
-        archive_html += f'''                <a href="./{summary['file']}" class="archive-card">
-                    <div class="archive-date">{summary['display_date']}</div>
-                    <div class="archive-preview">View comprehensive tech news digest with 20 stories, analysis, and actionable insights.</div>
-                </a>
-'''
-    
-    # Find and replace archive section
-    start_marker = '<div class="archive-grid" id="archive-list">'
-    end_marker = '</div>\n        </div>\n\n        <div class="sources-section">'
-    
-    if start_marker not in index_html or end_marker not in index_html:
-        print("❌ Could not find archive section markers in index.html")
-        return
-    
-    before = index_html.split(start_marker)[0]
-    after = index_html.split(end_marker)[1]
-    
-    new_html = before + start_marker + '\n' + archive_html + '            ' + end_marker + after
-    
-    # Write back
-    with open(index_file, 'w') as f:
-        f.write(new_html)
-    
-    print(f"✅ Landing page updated with {len(archive['summaries'][:7])} recent summaries")
+        return False
+    summaries = sorted(archive.get('summaries', []), key=lambda s: s['date'], reverse=True)
+
+    artifacts = {}
+    with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+        index_html = landing_html(f.read(), summaries)
+    if index_html is None:
+        print(f"❌ {INDEX_FILE} is missing the {START_MARKER} / {END_MARKER} markers")
+    else:
+        artifacts[INDEX_FILE] = index_html
+
+    with open(ARCHIVE_TEMPLATE, 'r', encoding='utf-8') as f:
+        template = f.read()
+    months = by_month(summaries)
+    order = list(months)
+    targets = [date_str[:7]] if date_str and date_str[:7] in months else order
+    for month in targets:
+        i = order.index(month)
+        # The older neighbour is included so its "newer" link appears when a month starts
+        for j in range(i, min(i + 2, len(order)) if date_str else i + 1):
+            newer = order[j - 1] if j > 0 else None
+            older = order[j + 1] if j + 1 < len(order) else None
+            path = os.path.join(ARCHIVE_DIR, f'{order[j]}.html')
+            artifacts[path] = month_page(template, order[j], months[order[j]], newer, older)
+    artifacts[os.path.join(ARCHIVE_DIR, 'index.html')] = months_page(template, months)
+    if SITE_URL:
+        artifacts['feed.json'] = json_feed(summaries)
+        artifacts['rss.xml'] = rss_feed(summaries)
+    else:
+        # Feed readers need absolute links; relative ones would resolve against the feed host
+        print("⚠️  NEWS_SITE_URL not set - skipping feed.json and rss.xml")
+
+    written = publish(artifacts)
+    print(f"✅ Landing page: {min(len(summaries), LANDING_DAYS)} recent of {len(summaries)} digests, "
+          f"{len(written)} files changed")
+    return index_html is not None
+
+
+def backfill_metadata():
+    """Fill story counts, categories and TL;DRs for entries that predate them"""
+    from digest_format import iter_digests
+    from transform_news import save_archive
+
+    archive = load_archive() or {'summaries': []}
+    missing = {e['date']: e for e in archive['summaries'] if 'story_count' not in e}
+    if not missing:
+        return 0
+
+    filled = 0
+    for date_str, digest in iter_digests():
+        if date_str in missing:
+            missing.pop(date_str).update(digest_metadata(digest))
+            filled += 1
+
+    # Older days only exist as HTML; reuse the backfill extractor
+    from backfill import extract_source
+    from publish import bundle_path
+    for date_str, entry in missing.items():
+        source = entry['file'] if os.path.exists(entry['file']) else bundle_path(date_str[:7])
+        if not os.path.exists(source):
+            continue
+        _, stories = extract_source(source)
+        stories = [s for s in stories if s['page'] == os.path.basename(entry['file'])]
+        if stories:
+            entry.update(digest_metadata({'stories': stories, 'actions': []}))
+            entry.pop('action_count', None)
+            filled += 1
+
+    save_archive(archive)
+    print(f"✅ Backfilled metadata for {filled} archive entries")
+    return filled
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if '--rebuild' in argv:
+        backfill_metadata()
+        return 0 if update_landing_page() else 1
+    return 0 if update_landing_page(datetime.now().strftime('%Y-%m-%d')) else 1
+
 
 if __name__ == "__main__":
-    update_landing_page()
+    sys.exit(main())